@@ -6,7 +6,6 @@ import logging.handlers
 import os
 from datetime import datetime
 
-from blessed import Terminal
 from cans_common.keys import digest_key
 from cans_common.messages import CansMsgId, ShareFriend
 from olm import OlmAccountError
@@ -265,13 +264,13 @@ class Client:
             message = await self.session_manager.receive_system_message()
             if message.header.msg_id == CansMsgId.PEER_LOGIN:
                 # TODO: Make it more general
-                payload = Terminal().green_underline("User just logged in!")
+                payload = self.ui.term.green_underline("User just logged in!")
                 self.ui.on_system_message_received(
                     payload, message.payload["peer"]
                 )
             elif message.header.msg_id == CansMsgId.PEER_LOGOUT:
                 # TODO: Make it more general
-                payload = Terminal().red_underline("User just logged out!")
+                payload = self.ui.term.red_underline("User just logged out!")
                 self.ui.on_system_message_received(
                     payload, message.payload["peer"]
                 )
@@ -299,7 +298,7 @@ class Client:
                         + f"{message.header.sender}"
                     )
             elif message.header.msg_id == CansMsgId.NACK_MESSAGE_NOT_DELIVERED:
-                payload = Terminal().silver("User is unavailable")
+                payload = self.ui.term.silver("User is unavailable")
                 self.ui.on_system_message_received(
                     payload, message.payload["peer"]
                 )
@@ -4,7 +4,17 @@ import inspect
 from collections import namedtuple
 from datetime import datetime
 from random import choice
-from typing import Any, Callable, List, Mapping, Optional, Union
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    Mapping,
+    Optional,
+    Union,
+)
 
 import pyperclip
 from blessed import Terminal
@@ -14,7 +24,7 @@ from ..database_manager_client import DatabaseManager
 from ..models import CansMessageState, Friend, Message
 from .input import InputMode
 from .state_machines import PasswordRecoveryState, StartupState, StateMachine
-from .tiles import ChatTile, PromptTile, Tile
+from .tiles import ChatTile, PromptTile, Tile, flush, write
 from .view import View
 
 PromptConfig = namedtuple("PromptConfig", "title prompt validation mask_input")
@@ -38,7 +48,7 @@ class UserInterface:
         self.db_manager = db_manager
 
         # Enter fullscreen mode
-        print(self.term.enter_fullscreen, end="")
+        write(self.term.enter_fullscreen)
 
         # Store the client callbacks
         self.input_callbacks = input_callbacks
@@ -52,7 +62,7 @@ class UserInterface:
 
         # start user input handler
         self.loop.create_task(self._handle_user_input())
-        self.cmds_layout: Mapping[Any, Callable[..., Optional[str]]] = {
+        cmds_layout: Dict[Any, Callable[..., bool]] = {
             # arrow keys
             self.term.KEY_LEFT:  self.view.layout.cmd_left,
             self.term.KEY_RIGHT: self.view.layout.cmd_right,
@@ -77,7 +87,24 @@ class UserInterface:
             # ctrl+d
             chr(4):     self.close_tile,
         }  # fmt: skip
-        """Key mapping for layout changing commands"""
+        # read-only, it's built once and never changes
+        self.cmds_layout: Mapping[Any, Callable[..., bool]] = MappingProxyType(
+            cmds_layout
+        )
+        """Key mapping for layout changing commands.
+
+        Every command returns whether the screen needs to be redrawn.
+        """
+
+        self.focus_cmds: FrozenSet[Callable[..., bool]] = frozenset(
+            (
+                self.view.layout.cmd_down,
+                self.view.layout.cmd_up,
+                self.view.layout.cmd_left,
+                self.view.layout.cmd_right,
+            )
+        )
+        """Focus changing commands, they don't need a full redraw."""
 
         self.slash_cmds: Mapping[str, CommandConfig] = {
             "chat": CommandConfig(
@@ -187,7 +214,7 @@ class UserInterface:
 
         self.loop.run_until_complete(self.create_queue())
 
-        self.loop.create_task(self.view.render_all())
+        self.loop.call_soon(self.view.render_all)
 
         self.self_user_id: Optional[str] = None
 
@@ -315,7 +342,9 @@ class UserInterface:
         """Shut down the user interface."""
         self.view.footer.terminate()
         self.view.close_threads()
-        print(self.term.exit_fullscreen)
+        write(self.term.exit_fullscreen + "\n")
+        # the process exits right after, don't wait for the event loop
+        flush()
 
     def set_identity_user(self, identity: Friend) -> None:
         """Set given Friend as myself."""
@@ -552,38 +581,39 @@ class UserInterface:
                     self.view.add_message(tile.chat_with, message_model)
             elif len(self.view.find_chats(self.system_user)) == 0:
                 self.view.add_chat(self.system_user)
-                self.loop.create_task(self.view.render_all())
+                self.loop.call_soon(self.view.render_all)
 
         else:
             self.on_new_message_received(message_model, relevant_user)
 
-    def close_tile(self, target: Union[Tile, str, None] = None) -> None:
-        """Close a tile."""
+    def close_tile(self, target: Union[Tile, str, None] = None) -> bool:
+        """Close a tile, return whether anything was closed."""
         if not target:
             targets = [self.view.layout.current_tile]
         elif isinstance(target, str):
             friend = self.get_friend_by_username(target)
             if not friend:
-                return
+                return False
             targets = self.view.find_chats(
                 chats_with=friend.id  # type: ignore
             )
         else:
             targets = [target]
+        closed = False
         try:
             # we don't want to close StartupTiles
             for target in targets:
                 if target and not target == self.prompt_tile:
                     self.last_closed_tile.append(target)
                     self.view.layout.remove(target)
+                    closed = True
         except IndexError:
-            return
+            pass
 
-        self.loop.create_task(self.view.layout.render_all())
+        return closed
 
-    def reopen_tile(self) -> None:
-        """Reopen last closed tile."""
-        target = self.view.layout.current_tile
+    def reopen_tile(self) -> bool:
+        """Reopen last closed tile, return whether anything was reopened."""
         if len(self.last_closed_tile) > 0:
             target = self.last_closed_tile.pop()
 
@@ -593,8 +623,9 @@ class UserInterface:
                 self.view.add_chat(target.chat_with)
             else:
                 self.view.layout.add(target)
+            return True
         else:
-            return
+            return False
 
     def commands_allowed(self) -> bool:
         """Determine whether user can use commands.
@@ -627,7 +658,7 @@ class UserInterface:
         )
 
         self.view.layout.add(message_prompt)
-        self.loop.run_until_complete(self.view.render_all())
+        self.view.render_all()
 
     def show_mnemonics(self, mnemonics: List[str]) -> None:
         """Show a generated list of one-time passwords.
@@ -666,7 +697,7 @@ class UserInterface:
         )
 
         self.view.layout.add(welcome_screen)
-        self.loop.run_until_complete(self.view.render_all())
+        self.view.render_all()
 
     def blocking_prompt(
         self,
@@ -679,16 +710,8 @@ class UserInterface:
         reference.
         """
         self.set_prompt_tile(prompt_config)
-        self.loop.run_until_complete(self.view.render_all())
 
-        # set feedback if any
-        assert self.prompt_tile
-        if feedback:
-            self.loop.run_until_complete(
-                self.prompt_tile.consume_input(feedback, self.term)
-            )
-
-        user_input = self.loop.run_until_complete(self.prompt_queue.get())
+        user_input = self.loop.run_until_complete(self._prompt(feedback))
 
         # reset input masking
         self.view.set_input_masking(False)
@@ -699,6 +722,21 @@ class UserInterface:
         """Create a queue inside event loop."""
         self.prompt_queue: asyncio.Queue = asyncio.Queue()
 
+    async def _prompt(self, feedback: str = "") -> str:
+        """Show the prompt tile and wait for user input.
+
+        Does the whole prompt stage in a single run of the event loop.
+        """
+        # set feedback if any
+        assert self.prompt_tile
+        if feedback:
+            await self.prompt_tile.consume_input(feedback, self.term)
+
+        self.view.render_all()
+
+        # wait for user input
+        return await self.prompt_queue.get()
+
     def _multistage_prompt(
         self,
         state_machine: StateMachine,
@@ -714,17 +752,7 @@ class UserInterface:
             # Generate prompt window
             self.set_prompt_tile(state=state_machine.state)
 
-            # set feedback if any
-            assert self.prompt_tile
-            if feedback != "":
-                self.loop.run_until_complete(
-                    self.prompt_tile.consume_input(feedback, self.term)
-                )
-
-            self.loop.run_until_complete(self.view.render_all())
-
-            # wait for user input
-            user_input = self.loop.run_until_complete(self.prompt_queue.get())
+            user_input = self.loop.run_until_complete(self._prompt(feedback))
 
             output[i] = user_input
 
@@ -784,141 +812,144 @@ class UserInterface:
 
     async def _handle_user_input(self) -> None:
         """Handle user input asynchronously."""
-        # set of focues commands, we use to not re render
-        # everything on focus change
-        focus_cmds = [
-            self.view.layout.cmd_down,
-            self.view.layout.cmd_up,
-            self.view.layout.cmd_left,
-            self.view.layout.cmd_right,
-        ]
+        queue = self.view.input_queue()
+
+        # layout changes are rendered only once a batch of input is
+        # handled, so a burst of input (e.g. autorepeated keys) is drawn once
+        redraw_all = False
+        redraw_focus = False
 
         # run forever
         while True:
-            # get input from the input queue
-            input_message = await (self.view.input_queue().get())
-
-            # first part of input is input mode
-            mode = input_message.mode
-            # second part in input itself
-            input_text = input_message.text
-
-            cmd = None
-
-            # handle graceful exit
-            if mode == InputMode.EXIT:
-                # Note that shutdown is an async coroutine and
-                # must be awaited
-                await self.input_callbacks["graceful_shutdown"]()
-
-            # command mode
-            elif mode == InputMode.COMMAND and self.commands_allowed():
-                try:
-                    if input_text[0] in self.slash_cmds:
-                        cmd = self.slash_cmds[input_text[0]].callback
-                        cmd(*input_text[1])
-
-                    else:
+            # take everything that's been queued
+            for input_message in await queue.get_all():
+                # first part of input is input mode
+                mode = input_message.mode
+                # second part in input itself
+                input_text = input_message.text
+
+                cmd = None
+
+                # handle graceful exit
+                if mode == InputMode.EXIT:
+                    # Note that shutdown is an async coroutine and
+                    # must be awaited
+                    await self.input_callbacks["graceful_shutdown"]()
+
+                # command mode
+                elif mode == InputMode.COMMAND and self.commands_allowed():
+                    try:
+                        if input_text[0] in self.slash_cmds:
+                            cmd = self.slash_cmds[input_text[0]].callback
+                            # commands returning True changed the layout
+                            if cmd(*input_text[1]):
+                                redraw_all = True
+
+                        else:
+                            self.on_system_message_received(
+                                message=self.term.red(
+                                    f"Unknown command: /{input_text[0]}. "
+                                    f"Type {self.term.purple('/help')} "
+                                    f"to see available commands."
+                                )
+                            )
+                    except Exception as ex:
                         self.on_system_message_received(
                             message=self.term.red(
-                                f"Unknown command: /{input_text[0]}. "
-                                f"Type {self.term.purple('/help')} "
-                                f"to see available commands."
+                                "Error executing slash command: " + ex.args[0]
                             )
                         )
-                except Exception as ex:
-                    self.on_system_message_received(
-                        message=self.term.red(
-                            "Error executing slash command: " + ex.args[0]
-                        )
-                    )
-
-            # layout mode, we're working inside the UI so
-            # the user input isn't sent anywhere
-            elif mode == InputMode.LAYOUT and input_text in self.cmds_layout:
-                cmd = self.cmds_layout[input_text]
-                if cmd:
-                    # handle last closed tile reopening
-                    if cmd == self.view.layout.add:
-                        if len(self.last_closed_tile) > 0:
-                            target = self.last_closed_tile.pop()
-                            cmd(target)
-                        else:
+
+                # layout mode, we're working inside the UI so
+                # the user input isn't sent anywhere
+                elif mode == InputMode.LAYOUT:
+                    cmd = self.cmds_layout.get(input_text)
+                    if cmd is not None:
+                        # nothing visible changed, skip the redraw
+                        if not cmd():
                             continue
-                    else:
-                        cmd()
-
-                    if cmd in focus_cmds:
-                        await self.view.layout.render_focus()
-                    else:
-                        await self.view.layout.render_all()
-            # 'normal' input mode, we gather the input and then
-            # issue a callback based on focused file type
-            elif mode == InputMode.NORMAL:
-                tile = self.view.layout.current_tile
-
-                if tile and isinstance(tile, ChatTile) and input_text != "":
-                    if isinstance(input_text, str):
-                        input_text = input_text.strip()
 
-                    if tile.is_prompting.locked() and isinstance(
-                        input_text, str
+                        if cmd in self.focus_cmds:
+                            redraw_focus = True
+                        else:
+                            redraw_all = True
+                # 'normal' input mode, we gather the input and then
+                # issue a callback based on focused file type
+                elif mode == InputMode.NORMAL:
+                    tile = self.view.layout.current_tile
+
+                    if (
+                        tile
+                        and isinstance(tile, ChatTile)
+                        and input_text != ""
                     ):
-                        await tile.consume_input(input_text, self.term)
-                    elif input_text == self.term.KEY_UP:
-                        if tile.increment_offset():
-                            await tile.render(self.term)
-                    elif input_text == self.term.KEY_DOWN:
-                        if tile.decrement_offset():
-                            await tile.render(self.term)
-                    elif tile.chat_with != self.system_user:
-                        new_message = Message(
-                            from_user=self.myself,
-                            to_user=tile.chat_with,  # type: ignore
-                            body=input_text,
-                            date=datetime.now(),
-                            state=CansMessageState.NOT_DELIVERED.value,
-                        )  # type: ignore
-                        tile.reset_offset()
-                        # pass the message to the client core
-                        await self.input_callbacks["upstream_message"](
-                            new_message
-                        )
-
-                # Prompt Tile handling
-                elif isinstance(tile, PromptTile) and isinstance(
-                    input_text, str
-                ):
-                    input_text = input_text.strip()
-                    feedback = ""
-                    # if validfation function is set, first validate input
-                    if tile.input_validation:
-                        validation = tile.input_validation(input_text)
-                        if not validation:
-                            feedback = (
-                                "Input validation failed. "
-                                "Try with different input."
+                        if isinstance(input_text, str):
+                            input_text = input_text.strip()
+
+                        if tile.is_prompting.locked() and isinstance(
+                            input_text, str
+                        ):
+                            await tile.consume_input(input_text, self.term)
+                        elif input_text == self.term.KEY_UP:
+                            if tile.increment_offset():
+                                tile.render(self.term)
+                        elif input_text == self.term.KEY_DOWN:
+                            if tile.decrement_offset():
+                                tile.render(self.term)
+                        elif tile.chat_with != self.system_user:
+                            new_message = Message(
+                                from_user=self.myself,
+                                to_user=tile.chat_with,  # type: ignore
+                                body=input_text,
+                                date=datetime.now(),
+                                state=CansMessageState.NOT_DELIVERED.value,
+                            )  # type: ignore
+                            tile.reset_offset()
+                            # pass the message to the client core
+                            await self.input_callbacks["upstream_message"](
+                                new_message
                             )
-                            await tile.consume_input(feedback, self.term)
-                            continue
-
-                    # prompt tile handling
-                    if tile == self.prompt_tile:
 
-                        await self.prompt_queue.put(input_text)
-                        if feedback != "":
-                            await self.prompt_tile.consume_input(
-                                feedback, self.term
-                            )
-                        await self.prompt_tile.render(self.term)
+                    # Prompt Tile handling
+                    elif isinstance(tile, PromptTile) and isinstance(
+                        input_text, str
+                    ):
+                        input_text = input_text.strip()
+                        feedback = ""
+                        # if validfation function is set, first validate input
+                        if tile.input_validation:
+                            validation = tile.input_validation(input_text)
+                            if not validation:
+                                feedback = (
+                                    "Input validation failed. "
+                                    "Try with different input."
+                                )
+                                await tile.consume_input(feedback, self.term)
+                                continue
+
+                        # prompt tile handling
+                        if tile == self.prompt_tile:
+
+                            await self.prompt_queue.put(input_text)
+                            if feedback != "":
+                                await self.prompt_tile.consume_input(
+                                    feedback, self.term
+                                )
+                            self.prompt_tile.render(self.term)
 
-                    else:
-                        if tile.close_on_input:
-                            self.close_tile(target=tile)
-                            await self.view.layout.render_all()
                         else:
-                            await tile.consume_input(
-                                f"Use {self.term.purple_bold('/chat')} "
-                                "to chat, don't waste your time here",
-                                self.term,
-                            )
+                            if tile.close_on_input:
+                                self.close_tile(target=tile)
+                                redraw_all = True
+                            else:
+                                await tile.consume_input(
+                                    f"Use {self.term.purple_bold('/chat')} "
+                                    "to chat, don't waste your time here",
+                                    self.term,
+                                )
+
+            if redraw_all:
+                self.view.layout.render_all()
+            elif redraw_focus:
+                self.view.layout.render_focus()
+            redraw_all = redraw_focus = False
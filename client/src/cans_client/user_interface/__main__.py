@@ -1,7 +1,6 @@
 """For CLI usage and debugging."""
 # import asyncio
 # import datetime
-# import hashlib
 
 # from blessed import Terminal
 
@@ -29,15 +28,19 @@
 #     db_manager=db_manager,
 # )
 
+# md5 digests of "ee" and "aa", precomputed
+# EVE_ID = "08a4415e9d594ff960030b921d42b91e"
+# BOB_ID = "4124bc0a9335c27f086f24ba207a4912"
+
 # eve = Friend(
 #     username="Eve",
-#     id=hashlib.md5("ee".encode("utf-8")).hexdigest(),
+#     id=EVE_ID,
 #     color="blue",
 # )
 
 # bob = Friend(
 #     username="Bob",
-#     id=hashlib.md5("aa".encode("utf-8")).hexdigest(),
+#     id=BOB_ID,
 #     color="red",
 # )
 
@@ -1,7 +1,9 @@
 """User input structures."""
+from asyncio import AbstractEventLoop, Event
+from collections import deque
 from dataclasses import dataclass
 from enum import IntEnum, auto
-from typing import Union
+from typing import Deque, List, Union
 
 
 class InputMode(IntEnum):
@@ -19,3 +21,45 @@ class InputMess:
 
     mode: InputMode
     text: Union[str, tuple]
+
+
+class InputQueue:
+    """Queue of user input, filled by the input thread.
+
+    There is a single producer (the input thread) and a single consumer
+    (the event loop), so a deque and an event waking the consumer up are
+    enough, no locking is needed.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty queue."""
+        self._items: Deque[InputMess] = deque()
+        self._ready = Event()
+
+    def put_threadsafe(self, mess: InputMess, loop: AbstractEventLoop) -> None:
+        """Put a message in the queue from the input thread."""
+        self._items.append(mess)
+        # the consumer clears the event before it checks the deque,
+        # so a set event means it's going to see this message anyway
+        if not self._ready.is_set():
+            loop.call_soon_threadsafe(self._ready.set)
+
+    async def get_all(self) -> List[InputMess]:
+        """Wait for a message and take all the messages out of the queue.
+
+        Everything typed or pasted since the last call comes in one batch,
+        which the consumer should handle before redrawing, once.
+        """
+        messages = [await self.get()]
+        items = self._items
+        while items:
+            messages.append(items.popleft())
+        return messages
+
+    async def get(self) -> InputMess:
+        """Wait for a message and take it out of the queue."""
+        while True:
+            self._ready.clear()
+            if self._items:
+                return self._items.popleft()
+            await self._ready.wait()
@@ -1,21 +1,147 @@
 """Tile classes for emulating independent I/O widgets of specified size."""
 
 import math
-from asyncio import BaseEventLoop, Lock, Queue, run_coroutine_threadsafe
-from collections import namedtuple
-from typing import Any, Callable, List, Optional, Tuple
+import sys
+from asyncio import BaseEventLoop, Lock, Queue, get_running_loop
+from collections import deque, namedtuple
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 
 from blessed import Terminal, keyboard
 
 from ..models import CansMessageState, Friend, Message
-from .input import InputMess, InputMode
+from .input import InputMess, InputMode, InputQueue
 
 BufferItem = namedtuple("BufferItem", "message y_pos")
 
+# setting up a Terminal is expensive, tiles share this one
+_TERM = Terminal()
+
+# margin colors of focused and unfocused tiles, looked up once
+_FOCUSED_COLOR = str(_TERM.purple)
+_UNFOCUSED_COLOR = str(_TERM.normal)
+
+# marks the end of truncated text
+_TRUNCATED = _TERM.on_red(">")
+
+# whitespace, other than spaces, which Terminal.wrap() changes
+_WRAPPED_WHITESPACE = frozenset("\t\n\v\f\r")
+
+# str.translate() table dropping control characters
+_CONTROL_CHARS = dict.fromkeys(range(ord(" ")))
+
+
+@lru_cache(maxsize=4096)
+def move_xy(t: Terminal, x: int, y: int) -> str:
+    """Return the sequence moving the cursor to (x, y), cached."""
+    return t.move_xy(x, y)
+
+
+@lru_cache(maxsize=1440)
+def time_tag(t: Terminal, hour: int, minute: int) -> str:
+    """Return the "[HH:MM]" tag of a message, cached."""
+    return t.gray(f"[{hour:02}:{minute:02}]")
+
+
+# output waiting to be written by flush()
+_pending: List[str] = []
+
+
+def length(t: Terminal, text: str) -> int:
+    """Return the printable length of text.
+
+    Plain ASCII text takes one cell per character, so Terminal.length(),
+    which parses escape sequences, is only used for anything else.
+    """
+    if text.isascii() and text.isprintable():
+        return len(text)
+    return t.length(text)
+
+
+def write(text: str) -> None:
+    """Write text to the terminal.
+
+    All UI output has to go through here to keep it in order. Inside the
+    event loop the text is queued, and everything written during one loop
+    iteration goes out in a single write.
+    """
+    try:
+        loop = get_running_loop()
+    except RuntimeError:
+        # nothing would flush it later
+        _pending.append(text)
+        flush()
+        return
+    if not _pending:
+        loop.call_soon(flush)
+    _pending.append(text)
+
+
+def flush() -> None:
+    """Write out the output queued by write()."""
+    if not _pending:
+        return
+    stream = sys.stdout.buffer
+    stream.write("".join(_pending).encode("utf-8"))
+    _pending.clear()
+    stream.flush()
+
+
+def _assemble(
+    prefixes: List[str], rows: List[str], shadow: List[Optional[str]], top: int
+) -> str:
+    """Return the rows which differ from the shadow, after their prefixes.
+
+    The shadow is updated to the new rows.
+    """
+    out: List[str] = []
+    append = out.append
+    for y, row in enumerate(rows, top):
+        if shadow[y] != row:
+            shadow[y] = row
+            append(prefixes[y])
+            append(row)
+    return "".join(out)
+
+
+def draw(t: Terminal, text: str) -> None:
+    """Write text to the terminal, leaving the cursor where it was."""
+    write(t.hide_cursor + t.save + text + t.restore + t.normal_cursor)
+
 
 class Tile:
     """Tile class for emulating an independent I/O widget of specified size."""
 
+    __slots__ = (
+        "name",
+        "x",
+        "y",
+        "title",
+        "body",
+        "_margins",
+        "_width",
+        "_height",
+        "_focused",
+        "_margin_color",
+        "_margins_key",
+        "_margins_str",
+        "real_width",
+        "real_height",
+        "_has_l",
+        "_has_r",
+        "_has_u",
+        "_has_d",
+        "_blank_row",
+        "_shadow",
+        "_shadow_geometry",
+        "_row_prefixes",
+        "_row_prefixes_geometry",
+        "_clear_str",
+        "_titlebar_key",
+        "_titlebar_str",
+    )
+
     margin = {
         "l": "|",
         "r": "|",
@@ -44,11 +170,27 @@ class Tile:
         self._width = 0
         self.width = width
         self.height = height
-        self.focused = False
+        self._focused = False
+        self._margin_color = _UNFOCUSED_COLOR
+        self._margins_key: Optional[Tuple[int, int, int, int, str, bool]]
+        self._margins_key = None
+        self._margins_str = ""
+        self._titlebar_key: Optional[Tuple[str, int, int, int]] = None
+        self._titlebar_str = ""
         self.title = title
         self.real_size()
         self.body = ""
 
+        # body rows as they are on screen, valid for the given geometry
+        self._shadow: List[Optional[str]] = []
+        self._shadow_geometry: Optional[Tuple[int, int, int, int]] = None
+
+        # cursor moves to the body rows, valid for the given geometry
+        self._row_prefixes: List[str] = []
+        self._row_prefixes_geometry: Optional[Tuple[int, int, int, int]]
+        self._row_prefixes_geometry = None
+        self._clear_str: Optional[str] = None
+
     @property
     def margins(self) -> str:
         """Define margins of tile."""
@@ -81,173 +223,223 @@ class Tile:
         self._height = height
         self.real_size()
 
+    @property
+    def focused(self) -> bool:
+        """Return whether the Tile is focused."""
+        return self._focused
+
+    @focused.setter
+    def focused(self, focused: bool) -> None:
+        """Set focus of a Tile, along with the color of its margins."""
+        self._focused = focused
+        self._margin_color = _FOCUSED_COLOR if focused else _UNFOCUSED_COLOR
+
     @property
     def real_x(self) -> int:
         """Return real x of a Tile (accounting margins)."""
-        return self.x + int("l" in self.margins)
+        return self.x + self._has_l
 
     @property
     def real_y(self) -> int:
         """Return real y of a Tile (accounting margins and titlebar)."""
-        return self.y + int("u" in self.margins) + 1
+        return self.y + self._has_u + 1
 
     async def consume_input(self, inp: str, t: Terminal) -> None:
         """Consume some input in some way."""
         self.body = inp
-        await self.render(t)
+        self.render(t)
 
     def real_size(self) -> None:
         """Calculate real size, excluding margins etc."""
-        width = (
-            self._width - int("l" in self.margins) - int("r" in self.margins)
-        )
-        height = (
-            self._height - int("u" in self.margins) - int("d" in self.margins)
-        ) - 1  # for titlebar
+        self._has_l = "l" in self._margins
+        self._has_r = "r" in self._margins
+        self._has_u = "u" in self._margins
+        self._has_d = "d" in self._margins
+
+        width = self._width - self._has_l - self._has_r
+        height = self._height - self._has_u - self._has_d - 1  # for titlebar
 
         self.real_width = width
         self.real_height = height
+        self._blank_row = " " * width
 
     def truncate(self, text: str, t: Terminal) -> str:
         """Truncate text to fit into the rendering box."""
-        out = text
-        if t.length(text) > self.real_width:
-            out = t.truncate(text, self.real_width - 1)
-            out += t.on_red(">")
-        return out
+        if length(t, text) <= self.real_width:
+            return text
+        return t.truncate(text, self.real_width - 1) + _TRUNCATED
 
-    async def render(self, t: Terminal) -> None:
+    def render(self, t: Terminal) -> None:
         """Render the Tile."""
-        # render title bar
-        await self.render_titlebar(t)
-
-        await self.clear_tile(t)
-        # print margins
-        await self.render_margins(t)
-
-    async def render_titlebar(self, t: Terminal) -> None:
-        """Render title bar of a Tile."""
-        with t.hidden_cursor(), t.location(
-            self.real_x,
-            self.real_y - 1,
-        ):
-            title = self.title if self.title != "" else self.name
+        draw(t, self.render_str(t))
+
+    def render_str(self, t: Terminal) -> str:
+        """Return the whole Tile, ready to be written."""
+        # title bar, then the cleared body and margins
+        return self.titlebar_str(t) + self.clear_str(t) + self.margins_str(t)
+
+    def titlebar_str(self, t: Terminal) -> str:
+        """Return title bar of a Tile, ready to be written."""
+        title = self.title if self.title != "" else self.name
+        # the title bar changes only with the title or geometry
+        key = (title, self.real_x, self.real_y, self.real_width)
+        if key != self._titlebar_key:
             out = self.truncate(title, t)
             out = t.ljust(out, self.real_width)
-            print(out, end="")
+            self._titlebar_str = (
+                move_xy(t, x=self.real_x, y=self.real_y - 1) + out
+            )
+            self._titlebar_key = key
+        return self._titlebar_str
 
-    async def render_margins(self, t: Terminal) -> None:
+    def render_margins(self, t: Terminal) -> None:
         """Render margins of a tile."""
-        attr = "purple" if self.focused else "normal"
+        draw(t, self.margins_str(t))
+
+    def margins_str(self, t: Terminal) -> str:
+        """Return margins of a tile, ready to be written."""
+        # margins change only with geometry or focus, reuse them otherwise
+        key = (
+            self.x,
+            self.y,
+            self._width,
+            self._height,
+            self._margins,
+            self._focused,
+        )
+        if key == self._margins_key:
+            return self._margins_str
 
-        color = getattr(t, attr)
-        if "l" in self._margins:
+        lines = []
+        if self._has_l:
+            out = self.margin["l"]
             for y in range(0, (self._height)):
-                with t.hidden_cursor(), t.location((self.x), (self.y + y)):
-                    out = self.margin["l"]
-                    print(color + out, end="")
-        if "r" in self._margins:
+                lines.append(move_xy(t, x=self.x, y=self.y + y) + out)
+        if self._has_r:
+            out = self.margin["r"]
+            x = self.x + self._width - 1
             for y in range(0, (self._height)):
-                with t.hidden_cursor(), t.location(
-                    (self.x + self._width - 1), (self.y + y)
-                ):
-                    out = self.margin["r"]
-                    print(color + (out), end="")
-        if "d" in self._margins:
-            with t.hidden_cursor(), t.location(
-                (self.x), (self.y + self._height - 1)
-            ):
-                out = (self._width) * self.margin["d"]
-                print(color + (out), end="")
-        if "u" in self._margins:
-            with t.hidden_cursor(), t.location((self.x), (self.y)):
-                out = (self._width) * self.margin["u"]
-                print(color + (out), end="")
-
-    async def render_focus(self, t: Terminal) -> None:
+                lines.append(move_xy(t, x=x, y=self.y + y) + out)
+        if self._has_d:
+            out = (self._width) * self.margin["d"]
+            y = self.y + self._height - 1
+            lines.append(move_xy(t, x=self.x, y=y) + out)
+        if self._has_u:
+            out = (self._width) * self.margin["u"]
+            lines.append(move_xy(t, x=self.x, y=self.y) + out)
+
+        self._margins_str = ""
+        if lines:
+            # color is set once for all the margins, and reset afterwards
+            # so it doesn't leak into whatever is drawn next
+            self._margins_str = self._margin_color + "".join(lines) + t.normal
+        self._margins_key = key
+        return self._margins_str
+
+    def render_focus(self, t: Terminal) -> None:
         """Render only the focus indicator."""
-        await self.render_margins(t)
+        self.render_margins(t)
 
     def info(self) -> str:
         """Return Tile info."""
-        return f"""
-----------------
-Tile            {self.name}
-x:              {self.x}
-y:              {self.y}
-width:          {self.width}
-height:         {self.height}
-----------------
+        return "\n".join(
+            (
+                "",
+                "----------------",
+                f"Tile            {self.name}",
+                f"x:              {self.x}",
+                f"y:              {self.y}",
+                f"width:          {self.width}",
+                f"height:         {self.height}",
+                "----------------",
+                "        ",
+            )
+        )
+
+    def body_str(self, t: Terminal, rows: List[str], top: int = 0) -> str:
+        """Return body rows starting at the top row, ready to be written.
+
+        Rows which are already on screen are left out.
         """
+        if not self.body_on_screen():
+            self._shadow_geometry = self._body_geometry()
+            self._shadow = [None] * self.real_height
 
-    async def print_buffer(
-        self,
-        buffer: List[str],
-        t: Terminal,
-        x: int,
-        y: int,
-        width: int,
-        height: int,
-    ) -> None:
-        """Print a buffer inside of the tile viewing box."""
-        # truncate the buffer to fit in the box
-        if x < 0:
-            x = 0
-        if y < 0:
-            y = 0
-        buffer = buffer[: min(height, self.real_height - y)]
-        buffer.reverse()
-
-        x_pos = self.real_x + x
-        y_pos = self.real_y + y
-
-        if len(buffer) > 0:
-            # print messages
-            with t.hidden_cursor(), t.location(
-                (x_pos),
-                (y_pos),
-            ):
-                max_y = min(len(buffer) - 1, self.real_height - 1)
-                for y in range(max_y, -1, -1):  # noqa: FKA01
-                    line = buffer[y]
+        return _assemble(
+            self.row_prefixes(t), rows=rows, shadow=self._shadow, top=top
+        )
+
+    def row_prefixes(self, t: Terminal) -> List[str]:
+        """Return the cursor moves to the start of each body row."""
+        geometry = self._body_geometry()
+        if geometry != self._row_prefixes_geometry:
+            self._row_prefixes = [
+                move_xy(t, x=self.real_x, y=self.real_y + y)
+                for y in range(self.real_height)
+            ]
+            self._row_prefixes_geometry = geometry
+            self._clear_str = None
+        return self._row_prefixes
+
+    def _body_geometry(self) -> Tuple[int, int, int, int]:
+        """Return position and size of the body."""
+        return self.real_x, self.real_y, self.real_width, self.real_height
+
+    def body_on_screen(self) -> bool:
+        """Return whether body_str knows what is on screen."""
+        return self._shadow_geometry == self._body_geometry()
 
-                    # with t.location():
-                    print(line, end="")
-                    y_diff = max_y - y + 1
-                    print(t.move_xy(x_pos, y_pos + y_diff), end="")
+    def forget_body(self) -> None:
+        """Make body_str write all the rows, e.g. if the tile was covered."""
+        self._shadow_geometry = None
 
-    async def clear_tile(self, t: Terminal) -> None:
-        """Clear tile for rendering."""
-        for i in range(self.real_height):
-            with t.location(
-                x=self.real_x, y=self.real_y + i
-            ), t.hidden_cursor():
-                print(" " * self.real_width, end="")
+    def clear_str(self, t: Terminal) -> str:
+        """Return whitespace covering the tile, ready to be written."""
+        prefixes = self.row_prefixes(t)
+        # built again only when row_prefixes() changes with the geometry
+        if self._clear_str is None:
+            blank = self._blank_row
+            self._clear_str = "".join(prefix + blank for prefix in prefixes)
+        return self._clear_str
 
 
 class HeaderTile(Tile):
     """Header Tile."""
 
+    __slots__ = (
+        "right_title",
+        "_frame",
+    )
+
     def __init__(
         self, right_title: str = "", *args: Any, **kwargs: Any
     ) -> None:
         """Init Header Tile."""
         self.right_title = right_title
+        # header changes only on resize, so it's drawn once and reused
+        self._frame: Optional[str] = None
         Tile.__init__(self, *args, **kwargs)
 
-    async def render_titlebar(self, t: Terminal) -> None:
-        """Render title bar of a HeaderTile."""
+    def real_size(self) -> None:
+        """Calculate real size, excluding margins etc."""
+        Tile.real_size(self)
+        self._frame = None
+
+    def titlebar_str(self, t: Terminal) -> str:
+        """Return title bar of a HeaderTile, ready to be written."""
         title_left = self.title
         title_right = t.rjust(self.right_title, t.width - t.length(title_left))
 
         self.title = title_left + title_right
-        await Tile.render_titlebar(self, t)
+        out = Tile.titlebar_str(self, t)
         self.title = title_left
+        return out
 
-    async def render(self, t: Terminal) -> None:
-        """Render the Tile."""
-        await self.render_margins(t)
-        await self.render_titlebar(t)
+    def render_str(self, t: Terminal) -> str:
+        """Return the whole HeaderTile, ready to be written."""
+        if self._frame is None:
+            self._frame = self.margins_str(t) + self.titlebar_str(t)
+        return self._frame
 
 
 class PromptTile(Tile):
@@ -258,6 +450,14 @@ class PromptTile(Tile):
     some additional features as well.
     """
 
+    __slots__ = (
+        "feedback",
+        "prompt_text",
+        "close_on_input",
+        "input_validation",
+        "border_color",
+    )
+
     def __init__(
         self,
         prompt_text: str,
@@ -280,10 +480,8 @@ class PromptTile(Tile):
         self.input_validation = input_validation_function
         self.border_color = border_color
 
-    async def render(self, t: Terminal) -> None:
-        """Render the Prompt Tile."""
-        await self.clear_tile(t)
-
+    def render_str(self, t: Terminal) -> str:
+        """Return the whole Prompt Tile, ready to be written."""
         # golden ratio :O
         phi = 1.618033988
 
@@ -300,41 +498,62 @@ class PromptTile(Tile):
         # construct the text print
         prompt = t.wrap(self.prompt_text, prompt_width)
         prompt += t.wrap(self.feedback, prompt_width)
-        prompt = (
-            [color("-") * prompt_width] + prompt + [color("-") * prompt_width]
-        )
+        border = color("-" * prompt_width)
+        prompt = [border] + prompt + [border]
         prompt = [t.center(text, prompt_width) for text in prompt]
         prompt_height = len(prompt)
 
-        await self.print_buffer(
-            prompt,
-            t,
-            x=int(self.real_width / 2 - math.ceil(prompt_width / 2)),
-            y=int(self.real_height / 2 - prompt_height / 2),
-            height=prompt_height,
-            width=prompt_width,
-        )
-        await self.render_margins(t)
-        await self.render_titlebar(t)
+        x = max(int(self.real_width / 2 - math.ceil(prompt_width / 2)), 0)
+        y = max(int(self.real_height / 2 - prompt_height / 2), 0)
+
+        # the prompt is centered in blank rows, so that only the rows which
+        # changed (e.g. the feedback) are written again
+        rows = [self._blank_row] * self.real_height
+        left = " " * x
+        right = " " * (self.real_width - x - prompt_width)
+        for i, line in enumerate(prompt[: self.real_height - y]):
+            rows[y + i] = left + line + right
+
+        out = self.body_str(t, rows)
+        out += self.margins_str(t) + self.titlebar_str(t)
+        return out
 
     async def consume_input(self, inp: str, t: Terminal) -> None:
         """Consume feedback input."""
         self.feedback = t.red("! ") + inp + t.red(" !")
-        await self.render(t)
+        self.render(t)
 
 
 class MessageTile(PromptTile):
     """Tile which sole purpose is to display a message."""
 
+    __slots__ = ()
+
     async def consume_input(self, inp: str, t: Terminal) -> None:
         """Consume input."""
         self.feedback = t.red("! ") + inp + t.red(" !")
-        await self.render(t)
+        self.render(t)
 
 
 class InputTile(Tile):
     """Input Tile."""
 
+    __slots__ = (
+        "_default_prompt",
+        "prompt",
+        "input_text",
+        "input_width",
+        "_frame",
+        "input_queue",
+        "prompt_position",
+        "max_input_length",
+        "mask_input",
+        "mode",
+        "_terminate",
+        "right_title",
+        "_display_pending",
+    )
+
     def __init__(
         self,
         max_input_length: int = 150,
@@ -347,9 +566,13 @@ class InputTile(Tile):
         self.prompt = prompt
         self.input_text = ""
         self.input_width = 0
+        # everything but the input changes only on resize,
+        # so it's drawn once and reused
+        self._frame: Optional[str] = None
+        self._display_pending = False
         Tile.__init__(self, *args, **kwargs)
-        self.input_queue: Queue = Queue()
-        self.prompt_position = math.floor(self.real_height / 2)
+        self.input_queue = InputQueue()
+        self.prompt_position = self.real_height // 2
         self.max_input_length = max_input_length
 
         self.mask_input = False
@@ -364,10 +587,7 @@ class InputTile(Tile):
     @property
     def allow_commands(self) -> bool:
         """Check whether command mode is allowed."""
-        if self.mask_input:
-            return False
-        else:
-            return True
+        return not self.mask_input
 
     def set_input_masking(self, mask_input: bool) -> None:
         """Set input masking on or off.
@@ -378,18 +598,11 @@ class InputTile(Tile):
 
     def real_size(self) -> None:
         """Calculate real size, excluding margins etc."""
-        width = (
-            self._width - int("l" in self.margins) - int("r" in self.margins)
-        )
-        height = (
-            self._height - int("u" in self.margins) - int("d" in self.margins)
-        ) - 1  # for titlebar
+        Tile.real_size(self)
+        self.input_width = self.real_width - _TERM.length(self.prompt)
+        self._frame = None
 
-        self.real_width = width
-        self.input_width = width - Terminal().length(self.prompt)
-        self.real_height = height
-
-    async def on_resize(self, t: Terminal) -> None:
+    def on_resize(self, t: Terminal) -> None:
         """
         React to terminal size change.
 
@@ -402,28 +615,59 @@ class InputTile(Tile):
         self.height = self.height
         self.x = self.x
 
-        self.prompt_position = math.floor(self.real_height / 2)
+        self.prompt_position = self.real_height // 2
 
         # it's always on the botton of the screen
         self.y = t.height - self.height
 
-        await self.render(t)
-        await self.display_input(t)
+        self.render(t)
+        self.display_input(t)
+
+    def put_threadsafe(self, mess: InputMess, loop: BaseEventLoop) -> None:
+        """Put a message in the input queue from the input thread."""
+        self.input_queue.put_threadsafe(mess, loop)
+
+    def render_threadsafe(
+        self, loop: BaseEventLoop, render: Callable[..., None], *args: Any
+    ) -> None:
+        """Run a rendering method from the input thread.
+
+        The event loop thread is the only one writing to the terminal,
+        the input thread just hands it the work.
+        """
+        loop.call_soon_threadsafe(render, *args)
+
+    def display_threadsafe(self, t: Terminal, loop: BaseEventLoop) -> None:
+        """Display the input from the input thread.
+
+        Keys typed before the event loop gets to display them are
+        displayed together.
+        """
+        if self._display_pending:
+            return
+        self._display_pending = True
+        loop.call_soon_threadsafe(self._display_pending_input, t)
+
+    def _display_pending_input(self, t: Terminal) -> None:
+        """Display the input, as it is now."""
+        # cleared first, so that changes made meanwhile are displayed too
+        self._display_pending = False
+        self.display_input(t)
 
     def input(self, term: Terminal, loop: BaseEventLoop) -> None:
         """Input function, kinda better edition."""
         self.input_text = ""
         prompt_location = self.prompt_location()
         # move cursor to prompt
-        run_coroutine_threadsafe(
-            self.print_threadsafe(
-                term.move_xy(prompt_location[0], prompt_location[1])
-            ),
+        self.render_threadsafe(  # noqa: FKA01
             loop,
+            self.print_threadsafe,
+            term.move_xy(prompt_location[0], prompt_location[1]),
         )
-        # basically run forever
-        while True:
-            with term.raw():
+        # basically run forever, staying in raw mode the whole time
+        # instead of switching the terminal mode on every poll
+        with term.raw():
+            while True:
                 val = term.inkey(0.1)
 
                 if self._terminate:
@@ -436,10 +680,16 @@ class InputTile(Tile):
                 next = term.inkey(
                     timeout=0.010
                 )  # this is basically polling rate
-                add_input = ""
-                while next and self.input_filter(next):
-                    add_input += next
-                    next = term.inkey(timeout=0.010)
+                pasted = []
+                while next and not next.is_sequence:
+                    pasted.append(next)
+                    # rest of the paste is already buffered, so take it
+                    # without waiting, but no more than fits in the input
+                    if len(pasted) >= self.max_input_length:
+                        break
+                    next = term.inkey(timeout=0)
+                # control characters are filtered out in one go
+                add_input = "".join(pasted).translate(_CONTROL_CHARS)
 
                 # workaround to have a working ctrl+c in raw mode
                 # and with threads
@@ -447,21 +697,15 @@ class InputTile(Tile):
                     # os._exit(1)
                     # break the loop to leave raw environment
                     # send a message that we want to quit
-                    run_coroutine_threadsafe(
-                        self.input_queue.put(
-                            InputMess(InputMode.EXIT, "exit")
-                        ),
-                        loop,
+                    self.put_threadsafe(
+                        InputMess(InputMode.EXIT, "exit"), loop
                     )
                     break
                 # if normal mode
                 if self.mode == InputMode.NORMAL:
                     if val.code == term.KEY_ESCAPE:
                         self.mode = InputMode.LAYOUT
-                        run_coroutine_threadsafe(
-                            self.display_input(term, self.input_text),
-                            loop,
-                        )
+                        self.display_threadsafe(term, loop)
                     elif (
                         val == "/"
                         and self.input_text == ""
@@ -469,10 +713,7 @@ class InputTile(Tile):
                     ):
                         self.mode = InputMode.COMMAND
                         self.input_text = ""
-                        run_coroutine_threadsafe(
-                            self.display_input(term, self.input_text),
-                            loop,
-                        )
+                        self.display_threadsafe(term, loop)
                     else:
                         # if key up or key down is pressed,
                         # send input to handle buffer scroll
@@ -480,22 +721,15 @@ class InputTile(Tile):
                             val.code == term.KEY_UP
                             or val.code == term.KEY_DOWN
                         ):
-                            run_coroutine_threadsafe(
-                                self.input_queue.put(
-                                    InputMess(
-                                        self.mode, val.code  # type: ignore
-                                    )
-                                ),
+                            self.put_threadsafe(
+                                InputMess(self.mode, val.code),  # type: ignore
                                 loop,
                             )
                         # if enter was pressed, return input
                         elif val.code == term.KEY_ENTER:
 
-                            run_coroutine_threadsafe(
-                                self.input_queue.put(
-                                    InputMess(self.mode, self.input_text)
-                                ),
-                                loop,
+                            self.put_threadsafe(
+                                InputMess(self.mode, self.input_text), loop
                             )
 
                             self.input_text = ""
@@ -509,39 +743,25 @@ class InputTile(Tile):
                             self.input_text = self.input_text[
                                 : self.max_input_length
                             ]
-                        run_coroutine_threadsafe(
-                            self.display_input(term), loop
-                        )
+                        self.display_threadsafe(term, loop)
                 # if layout mode
                 elif self.mode == InputMode.LAYOUT:
                     if val.code == term.KEY_ENTER:
                         self.mode = InputMode.NORMAL
-                        run_coroutine_threadsafe(
-                            self.display_input(term, self.input_text),
-                            loop,
-                        )
+                        self.display_threadsafe(term, loop)
                     elif val == "/" and self.allow_commands:
                         self.mode = InputMode.COMMAND
                         self.input_text = ""
 
-                        run_coroutine_threadsafe(
-                            self.display_input(term, ""), loop
-                        )
+                        self.display_threadsafe(term, loop)
                     else:
                         if self.input_filter(val) or not val.code:
-                            run_coroutine_threadsafe(
-                                self.input_queue.put(
-                                    InputMess(self.mode, val)
-                                ),
-                                loop,
+                            self.put_threadsafe(
+                                InputMess(self.mode, val), loop
                             )
                         else:
-                            run_coroutine_threadsafe(
-                                self.input_queue.put(
-                                    InputMess(
-                                        self.mode, val.code  # type: ignore
-                                    )
-                                ),
+                            self.put_threadsafe(
+                                InputMess(self.mode, val.code),  # type: ignore
                                 loop,
                             )
                 # if command mode
@@ -556,7 +776,7 @@ class InputTile(Tile):
                         self.mode = InputMode.NORMAL
                         self.input_text = ""
 
-                        run_coroutine_threadsafe(self.clear_input(term), loop)
+                        self.display_threadsafe(term, loop)
 
                     else:
                         # if enter was pressed, return input
@@ -570,18 +790,13 @@ class InputTile(Tile):
                                 args = command_with_args[1:]
                             else:
                                 args = []
-                            run_coroutine_threadsafe(
-                                self.input_queue.put(
-                                    InputMess(self.mode, (command, args))
-                                ),
-                                loop,
+                            self.put_threadsafe(
+                                InputMess(self.mode, (command, args)), loop
                             )
 
                             self.input_text = ""
                             self.mode = InputMode.NORMAL
-                            run_coroutine_threadsafe(
-                                self.clear_input(term), loop
-                            )
+                            self.display_threadsafe(term, loop)
 
                             continue
                         # handle backspace
@@ -592,28 +807,30 @@ class InputTile(Tile):
                             self.input_text = self.input_text[:-1]
                         elif self.input_filter(val):
                             self.input_text += val + add_input
-                        run_coroutine_threadsafe(
-                            self.display_input(term, self.input_text),
-                            loop,
-                        )
+                        self.display_threadsafe(term, loop)
 
-    async def clear_input(self, t: Terminal) -> None:
+    def clear_input(self, t: Terminal) -> None:
         """Clear the input line (print a lot of whitespaces)."""
         text = ""
 
-        await self.display_input(t, text)
+        self.display_input(t, text)
 
-    async def render_titlebar(self, t: Terminal) -> None:
-        """Render title bar of an InputTile."""
+    def titlebar_str(self, t: Terminal) -> str:
+        """Return title bar of an InputTile, ready to be written."""
         title_left = self.title
         title_right = t.rjust(self.right_title, t.width - t.length(title_left))
 
         self.title = title_left + title_right
-        await Tile.render_titlebar(self, t)
+        out = Tile.titlebar_str(self, t)
         self.title = title_left
+        return out
 
-    async def display_input(self, t: Terminal, text: str = None) -> None:
+    def display_input(self, t: Terminal, text: Optional[str] = None) -> None:
         """Display text in the input prompt."""
+        write(self.input_str(t, text))
+
+    def input_str(self, t: Terminal, text: Optional[str] = None) -> str:
+        """Return text in the input prompt, ready to be written."""
         if text is None:
             text = self.input_text
 
@@ -631,33 +848,34 @@ class InputTile(Tile):
 
         # handle input masking, for example when typing password
         if self.mask_input:
-            text = "*" * t.length(text) if t.length(text) >= 1 else ""
-
-        with t.hidden_cursor():
-            print(t.move_xy(x_pos, y_pos), end="")
-
-            out = self.truncate_input(text, t)  # type: ignore
-            print(self.prompt, end="")
-            print(out, end="")
-
-            # TODO: refactor this, we don't need to clear input everytime.
-            # I will probably do that with the 'move' refactor
-            # described in input()
-            with t.location():
-                clear_text = t.ljust(
-                    "",
-                    self.input_width - t.length(out),
-                )
-                print(clear_text, end="")
+            text = "*" * length(t, text)
+
+        out = self.truncate_input(text, t)  # type: ignore
+
+        # TODO: refactor this, we don't need to clear input everytime.
+        # I will probably do that with the 'move' refactor
+        # described in input()
+        clear_text = " " * (self.input_width - length(t, out))
+
+        # the cursor is left at the end of the input
+        return (
+            t.hide_cursor
+            + move_xy(t, x=x_pos, y=y_pos)
+            + self.prompt
+            + out
+            + t.save
+            + clear_text
+            + t.restore
+            + t.normal_cursor
+        )
 
-    async def print_threadsafe(self, text: str) -> None:
-        """Print given message asynchronously."""
-        with Terminal().hidden_cursor():
-            print(text, end="", flush=True)
+    def print_threadsafe(self, text: str) -> None:
+        """Print given message from the event loop."""
+        write(_TERM.hide_cursor + text + _TERM.normal_cursor)
 
     def prompt_location(self) -> Tuple[int, int]:
         """Return x and y coordinates of prompt."""
-        x_pos = Terminal().length(self.prompt) + self.real_x
+        x_pos = _TERM.length(self.prompt) + self.real_x
         y_pos = self.y + self.prompt_position
 
         return x_pos, y_pos
@@ -665,16 +883,37 @@ class InputTile(Tile):
     def truncate_input(self, text: str, t: Terminal) -> str:
         """Truncate text to fit into the input box."""
         out = text
-        if t.length(text) > self.input_width - 1:
-            out = text[t.length(text) - (self.input_width) + 1:]  # fmt: skip
-            self.prompt = t.on_red("<" * (t.length(self._default_prompt)))
-            # fmt:skip
+        overflow = length(t, text) - self.input_width + 1
+        if overflow > 0:
+            # cut off the characters on the left, but keep the sequences,
+            # slicing them would leave broken ones behind
+            parts = t.split_seqs(text)
+            for i, part in enumerate(parts):
+                if overflow <= 0:
+                    break
+                if not part.startswith("\x1b"):
+                    overflow -= length(t, part)
+                    parts[i] = ""
+            out = "".join(parts)
+            self.prompt = t.on_red("<" * (length(t, self._default_prompt)))
         return out
 
-    async def render(self, t: Terminal) -> None:
+    def render(self, t: Terminal) -> None:
         """Render the Tile."""
-        await Tile.render(self, t=t)
-        await self.display_input(t)
+        # the frame and the input line go out in one write
+        write(
+            t.hide_cursor
+            + t.save
+            + self.render_str(t)
+            + t.restore
+            + self.input_str(t)
+        )
+
+    def render_str(self, t: Terminal) -> str:
+        """Return the InputTile without the input, ready to be written."""
+        if self._frame is None:
+            self._frame = Tile.render_str(self, t)
+        return self._frame
 
     def input_filter(self, keystroke: keyboard.Keystroke) -> bool:
         """
@@ -696,6 +935,22 @@ class InputTile(Tile):
 class ChatTile(Tile):
     """Chat tile."""
 
+    __slots__ = (
+        "_wrap_cache",
+        "_wrap_width",
+        "_prefixes",
+        "_buffer",
+        "buffer_offset",
+        "chat_with",
+        "myself",
+        "_current_buffer",
+        "is_prompting",
+        "prompt_message",
+        "_prompt_message_printable",
+        "_printable_buffer",
+        "_prompt_queue",
+    )
+
     def __init__(
         self,
         chat_with: Friend,
@@ -705,8 +960,14 @@ class ChatTile(Tile):
         **kwargs: Any,
     ) -> None:
         """Init chat Tile."""
+        # wrapped messages by id, valid for the width they were wrapped to
+        self._wrap_cache: Dict[int, Tuple[Tuple, List[str]]] = {}
+        self._wrap_width = 0
+        # colored "[username]> " prefixes by username, color and state
+        self._prefixes: Dict[Tuple[str, str, bool], str] = {}
         Tile.__init__(self, *args, **kwargs)
-        self._buffer = buffer
+        # newest message first, new ones are added to the left
+        self._buffer: Deque[Message] = deque(buffer)
         self.buffer_offset = 0
         self.chat_with = chat_with
         self.myself = identity
@@ -725,24 +986,31 @@ class ChatTile(Tile):
 
         self.prompt_message = prompt_message
         self._construct_prompt_message(t)
-        await self.render(t)
+        self.render(t)
         input = await self._prompt_queue.get()
         self.prompt_message = ""
         self._prompt_message_printable = []
 
-        await self.render(t)
+        self.render(t)
         return input
 
+    def real_size(self) -> None:
+        """Calculate real size, excluding margins etc."""
+        Tile.real_size(self)
+        if self.real_width != self._wrap_width:
+            self._wrap_cache.clear()
+            self._wrap_width = self.real_width
+
     @property
-    def buffer(self) -> List[Message]:
+    def buffer(self) -> Deque[Message]:
         """Buffer for loaded messages."""
         return self._buffer
 
     @buffer.setter
-    async def buffer(self, buffer: List[Message]) -> None:
+    def buffer(self, buffer: List[Message]) -> None:
         """Buffer for loaded messages."""
-        self._buffer = buffer
-        await self.on_buffer_change()
+        self._buffer = deque(buffer)
+        self.on_buffer_change()
 
     def increment_offset(self) -> bool:
         """Increment buffer offset."""
@@ -765,105 +1033,141 @@ class ChatTile(Tile):
         self.buffer_offset = 0
         return True
 
-    async def add_message_to_buffer(self, mess: Message, t: Terminal) -> None:
+    def add_message_to_buffer(self, mess: Message, t: Terminal) -> None:
         """Add new message to buffer (newly received for example)."""
-        self._buffer.insert(0, mess)
+        self._buffer.appendleft(mess)
+
+        # scrolled up, prompting or not drawn yet, render it all
+        if (
+            self.buffer_offset
+            or self._prompt_message_printable
+            or not self.body_on_screen()
+        ):
+            self.on_buffer_change()
+            return
+
+        # otherwise older messages just move up, so the printable buffer is
+        # extended and only the rows which changed are written
         self._add_message_to_printable_buffer(mes=mess, t=t)
-        await self.on_buffer_change()
+        rows = self._printable_buffer[: self.real_height]
+        rows.reverse()
+        out = self.body_str(t, rows, top=self.real_height - len(rows))
+        if out:
+            draw(t, out)
 
-    async def update_message(self, new_message: Message) -> None:
+    def update_message(self, new_message: Message) -> None:
         """Update message in buffer."""
         filtered = filter(lambda x: x.id == new_message.id, self._buffer)
         for mess in filtered:
             mess.replace(new_message)
-            await self.render_message(mess)
+            self.render_message(mess)
 
-    async def update_message_status(
-        self, id: str, status: CansMessageState
-    ) -> None:
+    def update_message_status(self, id: str, status: CansMessageState) -> None:
         """Update status of message in buffer."""
         filtered = filter(lambda x: x.id == id, self._buffer)
         for mess in filtered:
             mess.state = status
-            await self.render_message(mess)
+            self.render_message(mess)
 
-    async def on_buffer_change(self) -> None:
+    def on_buffer_change(self) -> None:
         """Something happens on buffer change."""
         # pass
-        t = Terminal()
-        await self.render(t)
+        self.render(_TERM)
 
     async def consume_input(self, inp: str, t: Terminal) -> None:
         """Consume user input."""
         # for debug add message to buffer
         await self._prompt_queue.put(inp)
 
-    async def render_message(self, message: Message) -> bool:
+    def render_message(self, message: Message) -> bool:
         """Rerender just one message from current buffer."""
         filtered_buffer = list(
             filter(lambda x: x.message == message, self._current_buffer)
         )
-        t = Terminal()
+        t = _TERM
 
         if not filtered_buffer:
             return False
 
-        y_pos = self.y + int("u" in self.margins) + 1
-
+        out = ""
         for message_item in filtered_buffer:
-            with t.hidden_cursor(), t.location(
-                (self.real_x),
-                (y_pos + message_item.y_pos),
+            printable_message = self._construct_message_to_print(
+                t, message_item.message
+            )
+            if (
+                len(self._printable_buffer)
+                > self.real_height - 1 - message_item.y_pos
             ):
-                printable_message = self._construct_message_to_print(
-                    t, message_item.message
-                )
-                if (
-                    len(self._printable_buffer)
-                    > self.real_height - 1 - message_item.y_pos
-                ):
-                    for i, line in enumerate(printable_message):
-                        self._printable_buffer[
-                            self.real_height - 1 - message_item.y_pos + i
-                        ] = line
                 for i, line in enumerate(printable_message):
-                    if i > message_item.y_pos:
-                        break
-
-                    print(line, end="")
-                    print(
-                        t.move_xy(
-                            self.real_x, y_pos + message_item.y_pos - i - 1
-                        ),
-                        end="",
-                    )
+                    self._printable_buffer[
+                        self.real_height - 1 - message_item.y_pos + i
+                    ] = line
+
+            # message is printed from the bottom up, rows above the top
+            # of the tile are cut off
+            rows = printable_message[: max(message_item.y_pos + 1, 0)]
+            rows.reverse()
+            top = message_item.y_pos - len(rows) + 1
+            out += self.body_str(t, rows, top=top)
+
+        # all of it in one write, if anything changed on screen
+        if out:
+            draw(t, out)
         return True
 
     def _construct_message_to_print(
         self, t: Terminal, mes: Message
     ) -> List[str]:
         """Reduce a Message object to printable form."""
-        message = t.gray(mes.date.strftime("[%H:%M]"))
-        user_color = getattr(t, mes.from_user.color)
-        message += (
-            t.gray("[")
-            + user_color(mes.from_user.username)
-            + (
-                t.gray("]> ")
-                if mes.state == CansMessageState.DELIVERED
-                else t.gray("]") + t.red("? ")
+        user = mes.from_user
+        # messages are updated in place, so the cached lines are only
+        # valid for the content they were made from
+        key = (mes.date, user.username, user.color, mes.state, mes.body)
+        cached = self._wrap_cache.get(id(mes))
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        prefix_key = (
+            user.username,
+            user.color,
+            mes.state == CansMessageState.DELIVERED,
+        )
+        prefix = self._prefixes.get(prefix_key)
+        if prefix is None:
+            prefix = (
+                t.gray("[")
+                + getattr(t, user.color)(user.username)
+                + (
+                    t.gray("]> ")
+                    if prefix_key[2]
+                    else t.gray("]") + t.red("? ")
+                )
             )
+            self._prefixes[prefix_key] = prefix
+
+        date = mes.date
+        message = (
+            time_tag(t, hour=date.hour, minute=date.minute)
+            + prefix
             + str(mes.body)
         )
 
-        wrapped = (
-            t.wrap(message, self.real_width) if self.real_width > 0 else []
-        )
+        if self.real_width <= 0:
+            wrapped = []
+        elif (
+            not _WRAPPED_WHITESPACE.intersection(message)
+            and length(t, message) <= self.real_width
+        ):
+            # fits in one line as it is, no need to wrap it
+            wrapped = [message]
+        else:
+            wrapped = t.wrap(message, self.real_width)
         wrapped = [t.ljust(mes, self.real_width) for mes in wrapped]
         # we need to reverse because were printing from the bottom up
         if len(wrapped) > 0:
             wrapped.reverse()
 
+        self._wrap_cache[id(mes)] = (key, wrapped)
         return wrapped
 
     def _construct_prompt_message(self, t: Terminal) -> None:
@@ -891,11 +1195,15 @@ class ChatTile(Tile):
     ) -> None:
         """Add message to printable buffer."""
         printable = self._construct_message_to_print(t, mes)
+        # messages pushed above the top of the tile are dropped
         self._current_buffer = [BufferItem(mes, self.real_height - 1)] + [
             BufferItem(x.message, x.y_pos - len(printable))
-            for x in self._current_buffer[:-1]
+            for x in self._current_buffer
+            if x.y_pos - len(printable) >= 0
+        ]
+        self._printable_buffer = (printable + self._printable_buffer)[
+            : self.real_height
         ]
-        self._printable_buffer = printable + self._printable_buffer
 
     def _construct_current_buffer(self, t: Terminal) -> List[str]:
         """Construct a buffer of currently displayed messages.
@@ -908,55 +1216,39 @@ class ChatTile(Tile):
 
         prompt_message_len = len(self._prompt_message_printable)
         max_y = self.real_height - 1 - prompt_message_len
-        for i in range(self.buffer_offset, len(self._buffer)):
-            mes = self._buffer[i]
+        for mes in islice(  # noqa: FKA01
+            self._buffer, self.buffer_offset, None
+        ):
             buffer.append(BufferItem(mes, max_y - len(printable_messages)))
 
-            printable_messages += self._construct_message_to_print(t, mes)
-            if len(printable_messages) >= self.real_height:
+            printable_messages.extend(self._construct_message_to_print(t, mes))
+            # rows under the prompt message are full, the rest is cut off
+            if len(printable_messages) > max_y:
                 break
 
         self._current_buffer = buffer
 
         if len(printable_messages) < self.real_height:
-            printable_messages += [
-                t.ljust("", self.real_width)
-                for x in range(
-                    self.real_height
-                    - (len(printable_messages) + prompt_message_len)
-                )
-            ]
+            printable_messages += [self._blank_row] * (
+                self.real_height
+                - (len(printable_messages) + prompt_message_len)
+            )
 
         self._printable_buffer = printable_messages
         return printable_messages
 
-    async def render(self, t: Terminal) -> None:
-        """Render the Tile."""
-        await self.render_titlebar(t)
-        await self.render_margins(t)
+    def render_str(self, t: Terminal) -> str:
+        """Return the whole ChatTile, ready to be written."""
+        out = self.titlebar_str(t) + self.margins_str(t)
 
         buffer = self._construct_current_buffer(t)
         self._construct_prompt_message(t)
         buffer = self._prompt_message_printable + buffer
 
-        y_pos = (
-            self.y
-            + int("u" in self.margins)
-            + 1
-            + max(self.real_height - len(buffer), 0)
-        )
+        top = max(self.real_height - len(buffer), 0)
 
-        if len(buffer) > 0:
-            # print messages
-            with t.hidden_cursor(), t.location(
-                (self.real_x),
-                (y_pos),
-            ):
-                max_y = min(len(buffer) - 1, self.real_height - 1)
-                for y in range(max_y, -1, -1):  # noqa: FKA01
-                    line = buffer[y]
-
-                    # with t.location():
-                    print(line, end="")
-                    y_diff = max_y - y + 1
-                    print(t.move_xy(self.real_x, y_pos + y_diff), end="")
+        # print messages, rows that didn't change are skipped
+        max_y = min(len(buffer) - 1, self.real_height - 1)
+        rows = buffer[max_y::-1] if max_y >= 0 else []
+        out += self.body_str(t, rows, top=top)
+        return out
@@ -1,14 +1,28 @@
 """Contains tiling manager classes used by View."""
 import math
-import operator
 from collections import namedtuple
-from functools import reduce
-from typing import List, Optional
+from functools import lru_cache
+from itertools import accumulate, islice
+from typing import Any, Dict, List, Optional, Tuple
 
 from blessed import Terminal
 
 from .tile_list import TileList
-from .tiles import Tile
+from .tiles import Tile, draw, move_xy
+
+
+@lru_cache(maxsize=64)
+def column_widths(ratio: float, width: int) -> Tuple[int, int]:
+    """Return widths of the main and secondary columns, cached."""
+    return math.ceil(ratio * width), math.floor((1.0 - ratio) * width)
+
+
+@lru_cache(maxsize=4)
+def blank_str(t: Terminal, screen: Tuple[int, int, int, int]) -> str:
+    """Return the screen rect (width, height, x, y) blanked, cached."""
+    width, height, x, y = screen
+    out = width * " "
+    return "".join(move_xy(t, x=x, y=y + row) + out for row in range(height))
 
 
 class MonadTallLayout:
@@ -97,6 +111,17 @@ class MonadTallLayout:
     To toggle a tile window between its minimum and maximum sizes
     simply use the ``cmd_maximize`` on a focused tile.
 
+    Dirty flags:
+
+    Every ``cmd_*`` method returns whether it changed the layout (or the
+    focus), so the caller can skip redrawing on no-op key presses.
+
+    ``render_all`` only redraws the tiles whose position, size, margins
+    or focus changed since they were last drawn by it, when only the focus
+    changed just the margins are redrawn. Everything is drawn in a single
+    write. Use ``mark_dirty`` to force a redraw, e.g. when something else
+    has drawn over the tiles.
+
     Suggested Bindings::
 
         Key([modkey], "h", lazy.layout.left()),
@@ -114,15 +139,24 @@ class MonadTallLayout:
         Key([modkey, "shift"], "space", lazy.layout.flip()),
     """
 
+    __slots__ = (
+        "absolute_sizes",
+        "screen_rect",
+        "tiles",
+        "align",
+        "ratio",
+        "use_margins",
+        "min_secondary_size",
+        "max_displayed_windows",
+        "term",
+        "_drawn",
+        "_laid_out",
+    )
+
     _left = 0
     _right = 1
     _med_ratio = 0.5
 
-    # no one asked + L + touch grass + no maidens + ratio
-    ratio = 0.75
-    """
-    The percent of the screen-space the master pane should occupy
-    """
     default_ratio = 0.75
     """
     The percent of the screen-space the master pane should occupy
@@ -138,11 +172,6 @@ class MonadTallLayout:
     The percent of the screen-space the master pane should occupy
     at maximum.
     """
-    min_secondary_size = 1
-    """Minimum size in pixel for a secondary pane window """
-    align = _right
-    """Which side master plane will be placed
-    "(one of `_left` or `_right`)"""
     change_ratio = 0.05
     """Resize ratio"""
     change_size = 2
@@ -174,17 +203,30 @@ class MonadTallLayout:
             width=width, height=height, x=x, y=y
         )
         self.tiles = TileList(change_focus_on_add)
-        self.align = MonadTallLayout.align
-        self.ratio = MonadTallLayout.ratio
+        self.align = MonadTallLayout._right
+        """Which side master plane will be placed
+        "(one of `_left` or `_right`)"""
+        # no one asked + L + touch grass + no maidens + ratio
+        self.ratio = MonadTallLayout.default_ratio
+        """
+        The percent of the screen-space the master pane should occupy
+        """
 
         self.use_margins = use_margins
-        self.min_secondary_size += int(use_margins)
-        self.max_displayed_windows = math.floor(
-            self.screen_rect.height / self.min_secondary_size
+        self.min_secondary_size = 1 + int(use_margins)
+        """Minimum size in pixel for a secondary pane window """
+        self.max_displayed_windows = (
+            self.screen_rect.height // self.min_secondary_size
         )
 
         self.term: Terminal = term
 
+        self._drawn: Dict[Tile, Tuple[int, int, int, int, str, bool]] = {}
+        """Geometry and focus of tiles as they were last drawn."""
+
+        self._laid_out: Optional[Tuple[Any, ...]] = None
+        """Layout inputs as of the last layout_all."""
+
     # 'Hack' for linter coz it has a problem :)
     def clone(self) -> "MonadTallLayout":
         """Clone layout for other Views."""
@@ -203,29 +245,21 @@ class MonadTallLayout:
         c.term = self.term
         return c
 
-    def _get_relative_size_from_absolute(self, absolute_size: int) -> float:
-        return absolute_size / self.screen_rect.height
-
-    def _get_absolute_size_from_relative(self, relative_size: float) -> int:
-        return math.floor(relative_size * self.screen_rect.height)
-
     def screen_rect_change(
         self, width: int, height: int, x: int, y: int
     ) -> None:
         """Set the screen rect and redraw the screen."""
-        # Save relative sizes to preserve them
-        # relative_sizes = [
-        #    self._get_relative_size_from_absolute(val)
-        #    for val in self.absolute_sizes
-        # ]
+        if self.screen_rect == (width, height, x, y):
+            # same size, keep the layout but let it be drawn again
+            self.mark_dirty()
+            return
 
         self.screen_rect = MonadTallLayout.screen_rect_tuple(
             width=width, height=height, x=x, y=y
         )
-        # self._relative_sizes_to_absolute(relative_sizes)
 
-        self.max_displayed_windows = math.floor(
-            self.screen_rect.height / self.min_secondary_size
+        self.max_displayed_windows = (
+            self.screen_rect.height // self.min_secondary_size
         )
 
         # if the windows cant render, just kill them
@@ -238,8 +272,34 @@ class MonadTallLayout:
             except IndexError:
                 continue
 
-        self.cmd_normalize()
+        # preserve relative sizes if they still fit, start over otherwise
+        if not self._scale_sizes():
+            self.cmd_normalize()
         self.layout_all()
+        self.mark_dirty()
+
+    def _scale_sizes(self) -> bool:
+        """Scale secondary sizes to the screen height, keeping proportions.
+
+        Returns whether the scaled sizes fit, they are left as they were
+        otherwise.
+        """
+        n = len(self.tiles) - 1
+        sizes = self.absolute_sizes
+        total = sum(sizes)
+        if n <= 0 or len(sizes) != n or total <= 0:
+            return False
+
+        height = self.screen_rect.height
+        scaled = [size * height // total for size in sizes]
+        # rows lost to rounding go to the first panes
+        base, extra = divmod(height - sum(scaled), n)
+        scaled = [size + base + (i < extra) for i, size in enumerate(scaled)]
+        if min(scaled) < self.min_secondary_size:
+            return False
+
+        self.absolute_sizes = scaled
+        return True
 
     @property
     def focused(self) -> int:
@@ -259,137 +319,154 @@ class MonadTallLayout:
     def remove(self, tile: Tile) -> None:
         """Remove tile from layout."""
         self.tiles.remove(tile)
+        # its area is drawn over by others, it has to be redrawn if it's back
+        self.mark_dirty(tile)
         self.cmd_normalize()
 
+    def mark_dirty(self, tile: Optional[Tile] = None) -> None:
+        """Make render_all redraw the tile, or all of them if none given."""
+        if tile is None:
+            self._drawn.clear()
+            for each in self.tiles:
+                each.forget_body()
+        else:
+            self._drawn.pop(tile, None)
+            tile.forget_body()
+
+    def _inputs(self) -> Tuple[Any, ...]:
+        """Return everything the tile geometry is calculated from.
+
+        The first two, ratio and alignment, only affect the widths.
+        """
+        return (
+            self.ratio,
+            self.align,
+            self.screen_rect,
+            tuple(self.absolute_sizes),
+            tuple(self.tiles),
+        )
+
     def layout_all(self) -> None:
-        """Calculate the entire layout."""
+        """Calculate the entire layout.
+
+        Nothing is recalculated if none of its inputs changed, only the
+        widths if just the ratio or alignment did.
+        """
+        inputs = self._inputs()
+        if inputs == self._laid_out:
+            return
+        if self._laid_out is not None and inputs[2:] == self._laid_out[2:]:
+            self._set_widths()
+            self._laid_out = inputs
+            return
+
         # Set main pane height
         try:
-            self.tiles[0].height = self.screen_rect.height
-            self.tiles[0].y = self.screen_rect.y
+            main = self.tiles[0]
         except IndexError:
             return
+        _, height, _, y = self.screen_rect
+        # size setters recalculate the tile, only unchanged sizes are skipped
+        if main.height != height:
+            main.height = height
+        main.y = y
 
-        # Edge case, normalize if there are no absolute heights for sec. panes
-        if not self.absolute_sizes:
-            self.cmd_normalize(recalc=False)
+        # a lone main pane has no secondary heights to set
+        if len(self.tiles) > 1:
+            # Edge case, normalize if there are no absolute heights
+            if not self.absolute_sizes:
+                self.cmd_normalize(recalc=False)
 
-        # Set secondary panes heights
-        self._set_secondary_heights()
+            # Set secondary panes heights
+            self._set_secondary_heights()
 
         # Set widths
         self._set_widths()
+        self._laid_out = self._inputs()
 
         # for tile in self.tiles:
         #    tile.render()
 
-    def cmd_set_ratio(self, ratio: float) -> None:
+    def _state(self) -> Tuple[float, int, Tuple[int, ...]]:
+        """Return a snapshot of the layout parameters."""
+        return self.ratio, self.align, tuple(self.absolute_sizes)
+
+    def cmd_set_ratio(self, ratio: float) -> bool:
         """Directly set the main pane ratio."""
+        before = self.ratio
         ratio = min(self.max_ratio, ratio)
         self.ratio = max(self.min_ratio, ratio)
 
         self.layout_all()
+        return self.ratio != before
 
-    def cmd_normalize(self, recalc: bool = True) -> None:
+    def cmd_normalize(self, recalc: bool = True) -> bool:
         """Evenly distribute screen-space among secondary tiles."""
+        before = self._state()
         n = len(self.tiles) - 1  # exclude main tile, 0
 
         # if secondary tiles exist
         if n > 0 and self.screen_rect is not None:
-            relative_sizes = [(1.0 / n)] * n
-            self._relative_sizes_to_absolute(relative_sizes)
+            # split the height evenly, first panes take the leftover rows
+            base, extra = divmod(self.screen_rect.height, n)
+            self.absolute_sizes = [base + 1] * extra + [base] * (n - extra)
 
         # reset main pane ratio
         if recalc:
             self.layout_all()
+        return self._state() != before
 
-    def _relative_sizes_to_absolute(self, relative_sizes: List[float]) -> None:
-        """Calculate absolute sizes from a list of relative sizes (sum 1)."""
-        n = len(relative_sizes)
-        # check if screen can be distributed in its entirety
-        calc_height = reduce(
-            operator.add,
-            [self._get_absolute_size_from_relative(a) for a in relative_sizes],
-        )
-        pads = [0] * n
-        i = 0
-
-        # if not then check if any of secondary panes is focused:
-        if abs(calc_height - self.screen_rect.height) > 0:
-            # if not then add/subtract 1 pixel to/from every
-            # secondary pane until its ok
-            while calc_height < self.screen_rect.height:
-                amt = int(
-                    math.copysign(1, self.screen_rect.height - calc_height)
-                )
-                pads[i] += amt
-                i = (i + 1) % (n)
-                calc_height += amt
-
-        # calculate absolute sizes
-        self.absolute_sizes = []
-        for rel_val, pad in zip(relative_sizes, pads):
-            self.absolute_sizes.append(
-                self._get_absolute_size_from_relative(rel_val) + pad
-            )
-        # if any height is lesser than minimum, normalize heights
-        # for val in self.absolute_sizes:
-        #    if val < self.min_secondary_size:
-        #        self.cmd_normalize()
-        #        break
-
-    def cmd_reset(self, ratio: float = None, redraw: bool = True) -> None:
+    def cmd_reset(self, ratio: float = None, redraw: bool = True) -> bool:
         """Reset Layout."""
+        before = self._state()
         self.ratio = ratio or MonadTallLayout.default_ratio
-        if self.align == MonadTallLayout._left:
-            self.align = MonadTallLayout._right
+        self.align = MonadTallLayout._right
 
         self.cmd_normalize(redraw)
+        return self._state() != before
 
     def _set_widths(self) -> None:
         """Calculate x and width of all tiles."""
         ratio = self.ratio
+        tiles = self.tiles
+        width, _, x, _ = self.screen_rect
+        main = tiles[0]
 
-        if len(self.tiles) > 1:
+        if len(tiles) > 1:
+            main_width, sec_width = column_widths(ratio, width)
             # right alignment
             if self.align == MonadTallLayout._right:
-                self.tiles[0].x = self.screen_rect.x
-                # set main pane width
-                self.tiles[0].width = math.ceil(ratio * self.screen_rect.width)
-                # set secondary pane width and position
-                for i in range(1, len(self.tiles)):
-                    tile = self.tiles[i]
-                    tile.width = math.floor(
-                        (1.0 - ratio) * self.screen_rect.width
-                    )
-                    tile.x = self.tiles[0].width + self.screen_rect.x
+                main.x = x
+                sec_x = main_width + x
             # left alignment
             else:
-                sec_width = math.floor((1.0 - ratio) * self.screen_rect.width)
-                self.tiles[0].x = sec_width + self.screen_rect.x
-                # set main pane width
-                self.tiles[0].width = math.ceil(ratio * self.screen_rect.width)
-                # set secondary pane width and position
-                for i in range(1, len(self.tiles)):
-                    tile = self.tiles[i]
+                main.x = sec_width + x
+                sec_x = x
+            # set main pane width
+            if main.width != main_width:
+                main.width = main_width
+            # set secondary pane width and position
+            for tile in islice(tiles, 1, None):  # noqa: FKA01
+                if tile.width != sec_width:
                     tile.width = sec_width
-                    tile.x = self.screen_rect.x
+                tile.x = sec_x
         else:
             # set main pane width - fullscreen
-            self.tiles[0].x = self.screen_rect.x
-            self.tiles[0].width = self.screen_rect.width
+            main.x = x
+            if main.width != width:
+                main.width = width
 
     def _set_secondary_heights(self) -> None:
         """Calculate y and height of tiles."""
-        if len(self.tiles) > 1:
-            n = len(self.absolute_sizes)
-            # calculate absolute pixel height values and positions
-            height = 0
-            for i in range(0, n):
-                tile = self.tiles[i + 1]
-                tile.height = self.absolute_sizes[i]
-                tile.y = height + self.screen_rect.y
-                height += tile.height
+        sizes = self.absolute_sizes
+        # secondary panes are stacked, each one starts where the last ended
+        positions = accumulate(sizes, initial=self.screen_rect.y)
+        for tile, size, y in zip(  # noqa: FKA01
+            islice(self.tiles, 1, None), sizes, positions  # noqa: FKA01
+        ):
+            if tile.height != size:
+                tile.height = size
+            tile.y = y
 
     def _maximize_main(self) -> None:
         """Toggle the main pane between min and max size."""
@@ -418,13 +495,6 @@ class MonadTallLayout:
         else:
             self._grow_secondary(maxed_size)
 
-    def get_shrink_margin(self, i: int) -> int:
-        """Return how many remaining pixels a tile can shrink."""
-        return max(
-            0,
-            self.absolute_sizes[i] - self.min_secondary_size,
-        )
-
     def shrink(self, i: int, amt: int) -> int:
         """
         Reduce the size of a tile.
@@ -432,13 +502,14 @@ class MonadTallLayout:
         Will only shrink the tile until it reaches the configured minimum
         size. Any amount that was prevented in the resize is returned.
         """
-        # get max resizable amount
-        margin = self.get_shrink_margin(i)
+        sizes = self.absolute_sizes
+        # rows the tile can give up before reaching the minimum size
+        margin = max(0, sizes[i] - self.min_secondary_size)
         if amt > margin:  # too much
-            self.absolute_sizes[i] -= margin
+            sizes[i] -= margin
             return amt - margin
         else:
-            self.absolute_sizes[i] -= amt
+            sizes[i] -= amt
             return 0
 
     def shrink_up(self, idx: int, amt: int) -> int:
@@ -455,7 +526,9 @@ class MonadTallLayout:
         # for each tile before specified index
         for i in range(0, idx):
             # shrink by whatever is left-over of original amount
-            left -= left - self.shrink(i, left)
+            left = self.shrink(i, left)
+            if not left:
+                break
         # return unused shrink amount
         return left
 
@@ -471,7 +544,7 @@ class MonadTallLayout:
         Any amount that was unable to be applied to the tiles is returned.
         """
         # split shrink amount among number of tiles
-        per_amt = math.ceil(amt / idx)
+        per_amt = -(-amt // idx)  # rounded up
         left = amt  # track unused shrink amount
         # for each tile before specified index
         for i in range(0, idx):
@@ -497,7 +570,9 @@ class MonadTallLayout:
         # for each tile after specified index
         for i in range(idx + 1, len(self.absolute_sizes)):
             # shrink by current total left-over amount
-            left -= left - self.shrink(i, left)
+            left = self.shrink(i, left)
+            if not left:
+                break
         # return unused shrink amount
         return left
 
@@ -518,7 +593,7 @@ class MonadTallLayout:
         Any amount that was unable to be applied to the tiles is returned.
         """
         # split shrink amount among number of tiles
-        per_amt = math.ceil(amt / (len(self.absolute_sizes) - 1 - idx))
+        per_amt = -(-amt // (len(self.absolute_sizes) - 1 - idx))  # rounded up
         left = amt  # track unused shrink amount
         # for each tile after specified index
         for i in range(idx + 1, len(self.absolute_sizes)):
@@ -542,44 +617,53 @@ class MonadTallLayout:
 
     def _grow_secondary(self, amt: int) -> None:
         """Will grow the focused tile in the secondary pane."""
-        half_change_size = math.ceil(amt / 2)
+        focused = self.focused
+        # get size index
+        i = focused - 1
+        sizes = self.absolute_sizes
+        half_change_size = amt - amt // 2  # rounded up
         # track unshrinkable amounts
         left = amt
         # first secondary (top)
-        if self.focused == 1:
+        if focused == 1:
             # only shrink downwards
-            left -= amt - self.shrink_down_shared(0, amt)
+            left = self.shrink_down_shared(0, amt)
         # last secondary (bottom)
-        elif self.focused == len(self.tiles) - 1:
+        elif focused == len(self.tiles) - 1:
             # only shrink upwards
-            left -= amt - self.shrink_up(len(self.absolute_sizes) - 1, amt)
+            left = self.shrink_up(len(sizes) - 1, amt)
         # middle secondary
         else:
-            # get size index
-            i = self.focused - 1
-            # shrink up and down
-            left -= half_change_size - self.shrink_up_shared(
-                i, half_change_size
+            # rows the tiles above and below can still give up, passes
+            # over tiles which can't shrink anymore are skipped
+            min_size = self.min_secondary_size
+            up = sum(max(0, size - min_size) for size in sizes[:i])
+            down = sum(
+                max(0, size - min_size)
+                for size in islice(sizes, i + 1, None)  # noqa: FKA01
             )
-            if left > 0:
-                left -= half_change_size - self.shrink_down_shared(
-                    i, half_change_size
-                )
-            if left > 0:
-                left -= half_change_size - self.shrink_up_shared(
-                    i, half_change_size
-                )
-            if left > 0:
-                left -= half_change_size - self.shrink_down_shared(
-                    i, half_change_size
-                )
+            # shrink up and down, twice
+            for _ in range(2):
+                if left > 0 and up > 0:
+                    taken = half_change_size - self.shrink_up_shared(
+                        i, half_change_size
+                    )
+                    left -= taken
+                    up -= taken
+                if left > 0 and down > 0:
+                    taken = half_change_size - self.shrink_down_shared(
+                        i, half_change_size
+                    )
+                    left -= taken
+                    down -= taken
         # calculate how much shrinkage took place
         diff = amt - left
         # grow tile by diff amount
-        self.absolute_sizes[self.focused - 1] += diff
+        sizes[i] += diff
 
-    def cmd_maximize(self) -> None:
+    def cmd_maximize(self) -> bool:
         """Grow the currently focused tile to the max size."""
+        before = self._state()
         # if we have 1 or 2 panes or main pane is focused
         if len(self.tiles) < 3 or self.focused == 0:
             self._maximize_main()
@@ -587,8 +671,9 @@ class MonadTallLayout:
         else:
             self._maximize_secondary()
         self.layout_all()
+        return self._state() != before
 
-    def cmd_grow(self) -> None:
+    def cmd_grow(self) -> bool:
         """
         Grow current tile.
 
@@ -596,6 +681,7 @@ class MonadTallLayout:
         around it. Growing will stop when no other secondary tiles can reduce
         their size any further.
         """
+        before = self._state()
         if self.focused == 0:
             self._grow_main(self.change_ratio)
         elif len(self.tiles) == 2:
@@ -603,30 +689,31 @@ class MonadTallLayout:
         else:
             self._grow_secondary(self.change_size)
         self.layout_all()
+        return self._state() != before
 
-    def cmd_grow_main(self) -> None:
+    def cmd_grow_main(self) -> bool:
         """
         Grow main pane.
 
         Will grow the main pane, reducing the size of tiles in the secondary
         pane.
         """
+        before = self.ratio
         self._grow_main(self.change_ratio)
         self.layout_all()
+        return self.ratio != before
 
-    def cmd_shrink_main(self) -> None:
+    def cmd_shrink_main(self) -> bool:
         """
         Shrink main pane.
 
         Will shrink the main pane, increasing the size of tiles in the
         secondary pane.
         """
+        before = self.ratio
         self._shrink_main(self.change_ratio)
         self.layout_all()
-
-    def grow(self, idx: int, amt: int) -> None:
-        """Grow secondary tile by specified amount."""
-        self.absolute_sizes[idx] += amt
+        return self.ratio != before
 
     def grow_up_shared(self, idx: int, amt: int) -> None:
         """
@@ -635,8 +722,9 @@ class MonadTallLayout:
         Will grow all secondary tiles above the specified index by an equal
         share of the provided amount.
         """
+        sizes = self.absolute_sizes
         # split grow amount among number of tiles
-        per_amt = math.ceil(amt / idx)
+        per_amt = -(-amt // idx)  # rounded up
         left = amt  # track unused grow amount
 
         # for each tile after specified index
@@ -644,10 +732,10 @@ class MonadTallLayout:
             # shrink by equal amount and track left-over
             left -= per_amt
             if left > 0:
-                self.grow(i, per_amt)
+                sizes[i] += per_amt
             # if this change would've grown too much
             else:
-                self.grow(i, left + per_amt)
+                sizes[i] += left + per_amt
                 break
 
     def grow_down_shared(self, idx: int, amt: int) -> None:
@@ -657,19 +745,20 @@ class MonadTallLayout:
         Will grow all secondary tiles below the specified index by an equal
         share of the provided amount.
         """
+        sizes = self.absolute_sizes
         # split grow amount among number of tiles
-        per_amt = math.ceil(amt / (len(self.absolute_sizes) - 1 - idx))
+        per_amt = -(-amt // (len(sizes) - 1 - idx))  # rounded up
         left = amt  # track unused grow amount
 
         # for each tile after specified index
-        for i in range(idx + 1, len(self.absolute_sizes)):
+        for i in range(idx + 1, len(sizes)):
             # shrink by equal amount and track left-over
             left -= per_amt
             if left > 0:
-                self.grow(i, per_amt)
+                sizes[i] += per_amt
             # if this change would've grown too much
             else:
-                self.grow(i, left + per_amt)
+                sizes[i] += left + per_amt
                 break
 
     def _shrink_main(self, amt: float) -> None:
@@ -685,7 +774,11 @@ class MonadTallLayout:
     def _shrink_secondary(self, amt: int) -> None:
         """Will shrink the focused tile in the secondary pane."""
         # get focused tile
-        tile = self.tiles[self.focused]
+        focused = self.focused
+        # get size index
+        i = focused - 1
+        sizes = self.absolute_sizes
+        tile = self.tiles[focused]
 
         # get default change size
         change = amt
@@ -698,27 +791,26 @@ class MonadTallLayout:
             change = tile.height - self.min_secondary_size
 
         # calculate half of that change
-        half_change_1 = math.floor(change / 2)
-        half_change_2 = math.ceil(change / 2)
+        half_change_1 = change // 2
+        half_change_2 = change - half_change_1
 
         # first secondary (top)
-        if self.focused == 1:
+        if focused == 1:
             # only grow downwards
             self.grow_down_shared(0, change)
         # last secondary (bottom)
-        elif self.focused == len(self.tiles) - 1:
+        elif focused == len(self.tiles) - 1:
             # only grow upwards
-            self.grow_up_shared(len(self.absolute_sizes) - 1, change)
+            self.grow_up_shared(len(sizes) - 1, change)
         # middle secondary
         else:
-            i = self.focused - 1
             # grow up and down
             self.grow_up_shared(i, half_change_1)
             self.grow_down_shared(i, half_change_2)
         # shrink tiles by total change
-        self.absolute_sizes[self.focused - 1] -= change
+        sizes[i] -= change
 
-    def cmd_shrink(self) -> None:
+    def cmd_shrink(self) -> bool:
         """
         Shrink current tile.
 
@@ -726,6 +818,7 @@ class MonadTallLayout:
         around it. Shrinking will stop when the tile has reached the minimum
         size.
         """
+        before = self._state()
         if self.focused == 0:
             self._shrink_main(self.change_ratio)
         elif len(self.tiles) == 2:
@@ -733,96 +826,101 @@ class MonadTallLayout:
         else:
             self._shrink_secondary(self.change_size)
         self.layout_all()
+        return self._state() != before
 
-    def cmd_shuffle_up(self) -> None:
+    def cmd_shuffle_up(self) -> bool:
         """Shuffle the tile up the stack."""
+        before = self.focused
         self.tiles.shuffle_up()
         self.layout_all()
         target = self.tiles.current_tile
         if target:
             self.focus(target)
+        return self.focused != before
 
-    def cmd_shuffle_down(self) -> None:
+    def cmd_shuffle_down(self) -> bool:
         """Shuffle the tile down the stack."""
+        before = self.focused
         self.tiles.shuffle_down()
         self.layout_all()
         target = self.tiles.current_tile
         if target:
             self.focus(self.tiles[self.focused])
+        return self.focused != before
 
-    def cmd_flip(self) -> None:
+    def cmd_flip(self) -> bool:
         """Flip the layout horizontally."""
-        self.align = self._left if self.align == self._right else self._right
+        # _left and _right are 0 and 1
+        self.align ^= 1
         self.layout_all()
+        # a lone tile takes the whole screen either way
+        return len(self.tiles) > 1
 
-    def _get_closest(
-        self, x: int, y: int, tiles: List[Tile]
-    ) -> Optional[Tile]:
-        """Get closest tile to a point x,y."""
-        target = min(
-            tiles,
-            key=lambda c: math.hypot(c.x - x, c.y - y),
-            default=self.tiles.current_tile,
-        )
-        return target
+    def _beside(self, side: int) -> Optional[Tile]:
+        """Get the tile on the given side of the current tile.
+
+        Secondary tiles are stacked on the ``align`` side of the main pane,
+        so the neighbour is either the main tile or the top secondary one.
+        """
+        if len(self.tiles) < 2:
+            return None
+        if self.focused == 0:
+            return self.tiles[1] if side == self.align else None
+        return self.tiles[0] if side != self.align else None
 
-    def cmd_swap(self, tile1: Tile, tile2: Tile) -> None:
+    def cmd_swap(self, tile1: Tile, tile2: Tile) -> bool:
         """Swap two tiles."""
+        if tile1 is tile2:
+            return False
         self.tiles.swap(c1=tile1, c2=tile2, focus=1)
         self.layout_all()
         self.focus(tile1)
+        return True
 
-    def cmd_swap_left(self) -> None:
+    def cmd_swap_left(self) -> bool:
         """Swap current tile with closest tile to the left."""
         tile = self.tiles.current_tile
-        if tile:
-            x, y = tile.x, tile.y
-            candidates = [c for c in self.tiles if (c.x < x)]
-            target = self._get_closest(x=x, y=y, tiles=candidates)
-            if target:
-                self.cmd_swap(tile, target)
-
-    def cmd_swap_right(self) -> None:
+        target = self._beside(MonadTallLayout._left)
+        if tile and target:
+            return self.cmd_swap(tile, target)
+        return False
+
+    def cmd_swap_right(self) -> bool:
         """Swap current tile with closest tile to the right."""
         tile = self.tiles.current_tile
-        if tile:
-            x, y = tile.x, tile.y
-            candidates = [c for c in self.tiles if (c.x > x)]
-            target = self._get_closest(x=x, y=y, tiles=candidates)
-            if target:
-                self.cmd_swap(tile, target)
-
-    def cmd_swap_main(self) -> None:
+        target = self._beside(MonadTallLayout._right)
+        if tile and target:
+            return self.cmd_swap(tile, target)
+        return False
+
+    def cmd_swap_main(self) -> bool:
         """Swap current tile to main pane."""
         if self.align == self._left:
-            self.cmd_swap_left()
+            return self.cmd_swap_left()
         elif self.align == self._right:
-            self.cmd_swap_right()
+            return self.cmd_swap_right()
+        return False
 
-    def cmd_left(self) -> None:
+    def cmd_left(self) -> bool:
         """Focus on the closest tile to the left of the current tile."""
-        tile = self.tiles.current_tile
-        if tile:
-            x, y = tile.x, tile.y
-            candidates = [c for c in self.tiles if (c.x < x)]
-            target = self._get_closest(x=x, y=y, tiles=candidates)
-            if target:
-                self.focus(target)
-
-    def cmd_right(self) -> None:
+        target = self._beside(MonadTallLayout._left)
+        if target:
+            return self.focus(target)
+        return False
+
+    def cmd_right(self) -> bool:
         """Focus on the closest tile to the right of the current tile."""
-        tile = self.tiles.current_tile
-        if tile:
-            x, y = tile.x, tile.y
-            candidates = [c for c in self.tiles if (c.x > x)]
-            target = self._get_closest(x=x, y=y, tiles=candidates)
-            if target:
-                self.focus(target)
-
-    def focus(self, tile: Tile) -> None:
-        """Focus selected tile."""
+        target = self._beside(MonadTallLayout._right)
+        if target:
+            return self.focus(target)
+        return False
+
+    def focus(self, tile: Tile) -> bool:
+        """Focus selected tile, return whether the focus has changed."""
+        changed = tile is not self.tiles.current_tile
+        # the geometry doesn't depend on focus, no layout needed
         self.tiles.current_tile = tile
-        self.layout_all()
+        return changed
 
     def focus_first(self) -> Tile:
         """
@@ -856,53 +954,54 @@ class MonadTallLayout:
         """
         return self.tiles.focus_previous(tile)
 
-    def cmd_up(self) -> None:
+    def cmd_up(self) -> bool:
         """Focus (select) the tile before the focused one."""
         if self.tiles.current_tile is None:
-            return
+            return False
         tile = (
             self.focus_previous(self.tiles.current_tile) or self.focus_last()
         )
-        self.focus(tile)
+        return self.focus(tile)
 
-    def cmd_down(self) -> None:
+    def cmd_down(self) -> bool:
         """Focus (select) the tile after the focused one."""
         if self.tiles.current_tile is None:
-            return
+            return False
         tile = self.focus_next(self.tiles.current_tile) or self.focus_first()
-        self.focus(tile)
+        return self.focus(tile)
 
-    async def render_all(self) -> None:
+    def render_all(self) -> None:
         """Render all tiles on screen."""
-        term = self.term
-        if len(self.tiles) == 0:
-            screen = self.screen_rect
-            for y in range(0, (screen.height)):
-                with term.location((screen.x), (screen.y + y)):
-                    out = (screen.width) * " "
-                    print(out, end="")
-            return
-        await self.render_main()
-        await self.render_secondary()
+        out = self.render_all_str()
+        if out:
+            draw(self.term, out)
 
-    async def render_secondary(self) -> None:
-        """Render secondary tiles on screen."""
-        term = self.term
-        for tile in self.tiles[1:]:
-            i1 = self.tiles.index(tile)
-            i2 = self.tiles.current_index
-            tile.focused = i1 == i2
+    def render_all_str(self) -> str:
+        """Return all tiles which changed, ready to be written."""
+        if len(self.tiles) == 0:
+            return blank_str(self.term, self.screen_rect)
+        # all the tiles which changed are drawn at once
+        return self._main_str() + self._secondary_str()
+
+    def _secondary_str(self) -> str:
+        """Return the secondary tiles which changed, ready to be written."""
+        out = []
+        current = self.tiles.current_index
+        for i, tile in enumerate(
+            islice(self.tiles, 1, None), 1  # noqa: FKA01
+        ):
+            tile.focused = i == current
             # Set margins if using them
             if self.use_margins:
                 self.set_margins(tile)
             else:
                 tile.margins = ""
 
-            await tile.render(term)
+            out.append(self._dirty_str(tile))
+        return "".join(out)
 
-    async def render_main(self) -> None:
-        """Render main tile on screen."""
-        term = self.term
+    def _main_str(self) -> str:
+        """Return the main tile if it changed, ready to be written."""
         tile = self.tiles[0]
         tile.focused = self.tiles.current_index == 0
 
@@ -911,16 +1010,33 @@ class MonadTallLayout:
         else:
             tile.margins = ""
 
-        await tile.render(term)
-
-    async def render_focus(self) -> None:
+        return self._dirty_str(tile)
+
+    def _dirty_str(self, tile: Tile) -> str:
+        """Return what changed in the tile since it was last drawn."""
+        drawn = self._drawn.get(tile)
+        geometry = (tile.x, tile.y, tile.width, tile.height, tile.margins)
+        out = ""
+        if drawn is None or drawn[:5] != geometry:
+            out = tile.render_str(self.term)
+        elif drawn[5] != tile.focused:
+            out = tile.margins_str(self.term)
+        self._drawn[tile] = geometry + (tile.focused,)
+        return out
+
+    def render_focus(self) -> None:
         """Render only the focus indicator on screen."""
         term = self.term
-        for tile in self.tiles:
-            i1 = self.tiles.index(tile)
-            i2 = self.tiles.current_index
-            tile.focused = i1 == i2
-            await tile.render_focus(term)
+        out = []
+        current = self.tiles.current_index
+        for i, tile in enumerate(self.tiles):
+            tile.focused = i == current
+            out.append(tile.margins_str(term))
+
+            drawn = self._drawn.get(tile)
+            if drawn is not None:
+                self._drawn[tile] = drawn[:5] + (tile.focused,)
+        draw(term, "".join(out))
 
     def set_margins(self, tile: Tile) -> None:
         """Set margins of a tile."""
@@ -14,7 +14,8 @@ from blessed import Terminal
 
 from ..database_manager_client import CansMessageState, DatabaseManager
 from ..models import Friend, Message
-from .tiles import ChatTile, HeaderTile, InputTile, PromptTile
+from .input import InputQueue
+from .tiles import ChatTile, HeaderTile, InputTile, PromptTile, write
 from .tiling_managers import MonadTallLayout
 
 HEADER_HEIGHT = 2
@@ -35,7 +36,7 @@ class View:
         db_manager: DatabaseManager,
     ) -> None:
         """Instantiate a view."""
-        self.term = Terminal()
+        self.term = term
         self.loop = loop
         self.db_manager = db_manager
         self.pools: List[concurrent.futures.ThreadPoolExecutor] = []
@@ -95,10 +96,11 @@ class View:
         # self.layout.add(chat)
 
         # add a signal handler for resizing
+        self._resize_pending = False
         loop.add_signal_handler(signal.SIGWINCH, self.on_resize)
 
         # render the screen
-        loop.run_until_complete(self.render_all())
+        self.render_all()
 
     def set_input_masking(self, mask_input: bool) -> None:
         """Set input masking on or off.
@@ -131,11 +133,21 @@ class View:
 
         return friends_dict
 
-    async def render_all(self) -> None:
+    def render_all(self) -> None:
         """Render header, footer and layout."""
-        await (self.layout.render_all())
-        await (self.header.render(self.term))
-        await (self.footer.render(self.term))
+        t = self.term
+        self.layout.mark_dirty()
+        # everything is drawn with the cursor hidden once, the cursor
+        # is left in the input line
+        write(
+            t.hide_cursor
+            + t.save
+            + self.layout.render_all_str()
+            + self.header.render_str(t)
+            + self.footer.render_str(t)
+            + t.restore
+            + self.footer.input_str(t)
+        )
 
     async def run_in_thread(self, task: Callable, *args: Any) -> None:
         """Run function in another thread."""
@@ -167,7 +179,21 @@ class View:
         return startup
 
     def on_resize(self, *args: str) -> None:
-        """React to screen resize."""
+        """React to screen resize.
+
+        Resizes coming in before the screen is redrawn are handled
+        by a single redraw.
+        """
+        if self._resize_pending:
+            return
+        self._resize_pending = True
+        self.loop.call_soon(self._resize)
+
+    def _resize(self) -> None:
+        """Fit the view to the current terminal size and redraw it."""
+        # resizes from now on need another redraw
+        self._resize_pending = False
+
         self.layout.screen_rect_change(
             width=self.term.width,
             height=self.term.height - self.header.height - self.footer.height,
@@ -176,9 +202,9 @@ class View:
         )
         self.header.width = self.term.width
 
-        self.loop.create_task(self.layout.render_all())
-        self.loop.create_task(self.header.render(self.term))
-        self.loop.create_task(self.footer.on_resize(self.term))
+        self.layout.render_all()
+        self.header.render(self.term)
+        self.footer.on_resize(self.term)
 
     def add_chat(self, chat_with: Union[Friend, str]) -> None:
         """Add a chat tile with a given user."""
@@ -203,7 +229,7 @@ class View:
             buffer=history,
         )
         self.layout.add(chat)
-        self.loop.create_task(self.layout.render_all())
+        self.loop.call_soon(self.layout.render_all)
 
     def swap_chat(self, chat_with: Union[Friend, str]) -> None:
         """Add swap current tile with a new chat with given user."""
@@ -263,7 +289,7 @@ class View:
         chats = self.find_chats(chat_with)
         if len(chats) > 0:
             for chat in chats:
-                self.loop.create_task(chat.update_message(message))
+                self.loop.call_soon(chat.update_message, message)
 
     def update_message_status(
         self, chat_with: Union[Friend, str], id: str, status: CansMessageState
@@ -272,7 +298,9 @@ class View:
         chats = self.find_chats(chat_with)
         if len(chats) > 0:
             for chat in chats:
-                self.loop.create_task(chat.update_message_status(id, status))
+                self.loop.call_soon(  # noqa: FKA01
+                    chat.update_message_status, id, status
+                )
 
     def add_message(
         self,
@@ -297,13 +325,11 @@ class View:
             )
 
         for chat in chats:
-            self.loop.create_task(
-                chat.add_message_to_buffer(
-                    new_message, self.term
-                )  # type: ignore
-            )  # type: ignore
+            self.loop.call_soon(  # noqa: FKA01
+                chat.add_message_to_buffer, new_message, self.term
+            )
 
-    def input_queue(self) -> asyncio.Queue:
+    def input_queue(self) -> InputQueue:
         """Return user input queue."""
         return self.footer.input_queue
 